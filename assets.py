@@ -0,0 +1,227 @@
+import pygame as pg
+import os
+from collections import OrderedDict
+
+# Image files live next to the source files
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class Asset_Registry():
+    """
+    Process-wide cache of decoded images.
+    Every image file is decoded once and the resulting surface is shared by all entities that use it.
+
+    Attributes:
+        asset_dir (str): The folder the image files are loaded from.
+        images (dict): The decoded surfaces, keyed by file name.
+        frames (dict): Subsurfaces of shared images (e.g. spritesheet frames), keyed by file name and rect.
+        mips (dict): Smoothly halved copies of shared images, each a list from full size down, keyed by source surface.
+        scaled (OrderedDict): Scaled copies of shared images in least recently used order, keyed by source surface and target size.
+        max_scaled (int): The maximum number of scaled copies that are kept.
+        texts (OrderedDict): Rendered text surfaces in least recently used order, keyed by font, text, antialiasing and colours.
+        max_texts (int): The maximum number of rendered text surfaces that are kept.
+        hits (int): The number of requests that were served from the cache.
+        misses (int): The number of requests that had to decode a file.
+
+    Methods:
+        load(file_name): Returns the shared surface for an image file.
+        subsurface(file_name, rect): Returns a shared subsurface of an image file.
+        mip_tiers(image): Returns the halved copies of a shared image.
+        scale(image, size): Returns a cached scaled copy of a shared image.
+        render_text(font, text, antialias, color, background): Returns a cached rendering of a text.
+        memory_usage(): Returns the number of bytes held by the decoded surfaces.
+        stats(): Returns the cache statistics.
+        clear(): Drops all cached surfaces.
+    """
+
+    def __init__(self, asset_dir: str = ASSET_DIR, max_texts: int = 512, max_scaled: int = 256) -> None:
+        self.asset_dir = asset_dir
+        self.images = {}
+        self.frames = {}
+        self.mips = {}
+        self.scaled = OrderedDict()
+        self.max_scaled = max_scaled
+        self.texts = OrderedDict()
+        self.max_texts = max_texts
+        self.converted = set()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, file_name: str) -> pg.Surface:
+        """
+        Returns the shared surface for an image file, decoding it on first use.
+
+        Args:
+            file_name (str): The file name of the image, relative to the asset folder.
+
+        Returns:
+            Surface: The decoded image. The surface is shared and must not be modified.
+        """
+        image = self.images.get(file_name)
+        if image is None:
+            self.misses += 1
+            image = pg.image.load(os.path.join(self.asset_dir, file_name))
+            self.images[file_name] = image
+        else:
+            self.hits += 1
+        # convert_alpha() needs a display mode, so images loaded before the window exists are converted later
+        if file_name not in self.converted and pg.display.get_init() and pg.display.get_surface() is not None:
+            image = image.convert_alpha()
+            self.images[file_name] = image
+            self.converted.add(file_name)
+            # frames cut from the unconverted image have to be cut again
+            self.frames = {key: frame for key, frame in self.frames.items() if key[0] != file_name}
+        return image
+
+    def subsurface(self, file_name: str, rect: tuple) -> pg.Surface:
+        """
+        Returns a shared subsurface of an image file, e.g. a frame of a spritesheet.
+
+        Args:
+            file_name (str): The file name of the image, relative to the asset folder.
+            rect (tuple): The area of the frame as (x, y, width, height).
+
+        Returns:
+            Surface: The subsurface. It shares its pixels with the parent image.
+        """
+        image = self.load(file_name)
+        key = (file_name, tuple(rect))
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = image.subsurface(rect)
+            self.frames[key] = frame
+        return frame
+
+    def mip_tiers(self, image: pg.Surface) -> list:
+        """
+        Returns copies of a shared image that are each half the size of the one before, made once with smoothing.
+        Shrinking a large image far in one step with pg.transform.scale() skips most of its pixels and flickers;
+        starting from the closest tier keeps small sprites clean.
+
+        Args:
+            image (Surface): The shared source image.
+
+        Returns:
+            list: The tiers, starting with the image itself and ending at a few pixels.
+        """
+        tiers = self.mips.get(image)
+        if tiers is None:
+            tiers = [image]
+            width, height = image.get_size()
+            while width >= 8 and height >= 8:
+                width //= 2
+                height //= 2
+                try:
+                    tiers.append(pg.transform.smoothscale(tiers[-1], (width, height)))
+                except ValueError: # smoothscale only works on 24 and 32 bit surfaces
+                    tiers.append(pg.transform.scale(tiers[-1], (width, height)))
+            self.mips[image] = tiers
+        return tiers
+
+    def scale(self, image: pg.Surface, size: tuple) -> pg.Surface:
+        """
+        Returns a scaled copy of a shared image, made from the smallest mip tier that is at least as large.
+        The least recently used copies are dropped when there are more than max_scaled, so zooming does not pile them up.
+
+        Args:
+            image (Surface): The shared source image, as returned by load() or subsurface().
+            size (tuple): The target size in pixels. Fractional sizes are rounded.
+
+        Returns:
+            Surface: The scaled image. The surface is shared and must not be modified.
+        """
+        size = (round(size[0]), round(size[1]))
+        key = (image, size)
+        scaled_image = self.scaled.get(key)
+        if scaled_image is None:
+            source = image
+            for tier in self.mip_tiers(image):
+                if tier.get_width() < size[0] or tier.get_height() < size[1]:
+                    break
+                source = tier
+            scaled_image = pg.transform.scale(source, size)
+            self.scaled[key] = scaled_image
+            if len(self.scaled) > self.max_scaled:
+                self.scaled.popitem(last=False)
+        else:
+            self.scaled.move_to_end(key)
+        return scaled_image
+
+    def render_text(self, font: pg.font.Font, text: str, antialias: bool, color, background=None) -> pg.Surface:
+        """
+        Returns a rendering of a text, like font.render(), but rasterises each text only once.
+        The least recently used renderings are dropped when there are more than max_texts.
+
+        Args:
+            font (Font): The font to render with.
+            text (str): The text to render.
+            antialias (bool): Whether to smooth the edges of the glyphs.
+            color (Color): The colour of the text.
+            background (Color): The colour behind the text, None for a transparent background.
+
+        Returns:
+            Surface: The rendered text. The surface is shared and must not be modified.
+        """
+        key = (font, text, antialias, tuple(pg.Color(color)), None if background is None else tuple(pg.Color(background)))
+        surface = self.texts.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color, background)
+            self.texts[key] = surface
+            if len(self.texts) > self.max_texts:
+                self.texts.popitem(last=False)
+        else:
+            self.texts.move_to_end(key)
+        return surface
+
+    def memory_usage(self) -> int:
+        """
+        Returns the number of bytes held by the decoded surfaces.
+        Subsurfaces share their pixels with the parent image and are not counted.
+        """
+        return sum(image.get_width() * image.get_height() * image.get_bytesize() for image in self.images.values())
+
+    def stats(self) -> dict:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: The hit and miss counts, the number of cached images and their memory usage in bytes.
+        """
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "images": len(self.images),
+                "scaled": len(self.scaled),
+                "texts": len(self.texts),
+                "bytes": self.memory_usage()}
+
+    def clear(self) -> None:
+        """
+        Drops all cached surfaces and resets the statistics.
+        """
+        self.images = {}
+        self.frames = {}
+        self.mips = {}
+        self.scaled = OrderedDict()
+        self.texts = OrderedDict()
+        self.converted = set()
+        self.hits = 0
+        self.misses = 0
+
+# The registry shared by the whole process
+assets = Asset_Registry()
+
+class Asset():
+    """
+    A class attribute that stands for a shared image, e.g. `image = Asset("coal.png")`.
+    The image is looked up in the registry when it is read, so it is decoded on first use and no entity has to hold a reference to it.
+
+    Attributes:
+        file_name (str): The file name of the image, relative to the asset folder.
+    """
+
+    __slots__ = ("file_name",)
+
+    def __init__(self, file_name: str) -> None:
+        self.file_name = file_name
+
+    def __get__(self, instance, owner) -> pg.Surface:
+        return assets.load(self.file_name)
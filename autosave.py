@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+import queue
+from time import perf_counter
+
+class Autosaver():
+    """
+    Writes the changes of a world to its save file on a background thread.
+    The frame loop only collects the changed rows, which is cheap; all disk I/O happens on the writer thread.
+
+    Attributes:
+        world (World): The world that is saved.
+        interval (float): The number of seconds between autosaves.
+        last_save (float): The time of the last autosave, as returned by perf_counter().
+        last_stats (dict): The number of rows and wall time of the last write.
+        queue (Queue): The pending writes as (file path, changes) tuples. Instead of changes, a write can be a function that gets the connection.
+
+    Methods:
+        tick(): Starts an autosave if the interval has passed.
+        save(): Hands the current changes of the world to the writer thread.
+        submit(file_path, write): Runs a function with a connection to a save file on the writer thread.
+        flush(): Waits until all pending writes are done.
+    """
+
+    def __init__(self, world, interval: float = 60.0) -> None:
+        self.world = world
+        self.interval = interval
+        self.last_save = perf_counter()
+        self.last_stats = {}
+        self.queue = queue.Queue()
+        self.thread = None
+
+    def tick(self) -> None:
+        """
+        Starts an autosave if the interval has passed and the world has a save file to write to.
+        """
+        if perf_counter() - self.last_save >= self.interval:
+            self.last_save = perf_counter()
+            if self.world.world_saved:
+                self.save()
+
+    def save(self) -> None:
+        """
+        Collects the rows that changed since the last save and hands them to the writer thread.
+        """
+        changes = self.world.collect_changes()
+        if changes["inventory"] is None and not any(changes[key] for key in ("deletes", "upserts", "tile_deletes", "chunks")):
+            return
+        self.submit(self.world.current_save_fp, changes)
+
+    def submit(self, file_path: str, write) -> None:
+        """
+        Hands a write to the writer thread, after the writes that are already pending.
+
+        Args:
+            file_path (str): The path of the save file.
+            write (dict or callable): The changes, as returned by World.collect_changes(), or a function that is called with the connection.
+        """
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+            self.thread.start()
+        self.queue.put((file_path, write))
+
+    def flush(self) -> None:
+        """
+        Waits until all pending writes are done.
+        """
+        if self.thread is not None:
+            self.queue.join()
+
+    def run(self) -> None:
+        """
+        The writer thread. It keeps its own database connection, since sqlite connections cannot be shared between threads.
+        """
+        db_con = None
+        db_path = None
+        while True:
+            file_path, changes = self.queue.get()
+            try:
+                if file_path != db_path:
+                    if db_con is not None:
+                        db_con.close()
+                    db_con = sqlite3.connect(file_path, timeout=30)
+                    db_con.execute("PRAGMA journal_mode=WAL")
+                    db_con.execute("PRAGMA synchronous=NORMAL")
+                    db_path = file_path
+                if callable(changes):
+                    changes(db_con)
+                else:
+                    self.write(db_con, changes)
+            except sqlite3.Error as e:
+                print(f"Autosave failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def write(self, db_con: sqlite3.Connection, changes: dict) -> None:
+        """
+        Applies a set of changes to the save file in a single transaction.
+
+        Args:
+            db_con (Connection): The connection to the save file.
+            changes (dict): The changes, as returned by World.collect_changes().
+        """
+        start = perf_counter()
+        with db_con:
+            db_con.executemany("DELETE FROM entities WHERE id = ?", changes["deletes"])
+            # rows are keyed by entity ID, so new and changed entities are written the same way
+            db_con.executemany("INSERT OR REPLACE INTO entities (id, type, posX, posY, quantity) VALUES (?, ?, ?, ?, ?)", changes["upserts"])
+            # ground tiles have no entity ID, so changed tiles are replaced by position and get the next negative row ID
+            db_con.executemany("DELETE FROM entities WHERE type = 'Tile' AND posX = ? AND posY = ?", changes["tile_deletes"])
+            db_con.executemany("INSERT INTO entities (id, type, posX, posY, quantity) VALUES ((SELECT MIN(0, COALESCE(MIN(id), 0)) - 1 FROM entities), 'Tile', ?, ?, -1)", changes["tile_inserts"])
+            db_con.executemany("INSERT OR IGNORE INTO chunks (chunkX, chunkY) VALUES (?, ?)", changes["chunks"])
+            db_con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (changes["next_id"],))
+            if changes["player_id"] is not None:
+                db_con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('player_id', ?)", (changes["player_id"],))
+            if changes["inventory"] is not None:
+                db_con.execute("DELETE FROM player_inventory")
+                db_con.executemany("INSERT INTO player_inventory (item, quantity) VALUES (?, ?)", changes["inventory"])
+        rows = len(changes["deletes"]) + len(changes["upserts"]) + len(changes["tile_deletes"]) + len(changes["tile_inserts"]) + len(changes["chunks"]) + len(changes["inventory"] or [])
+        self.last_stats = {"rows": rows, "seconds": perf_counter() - start}
+        print(f"Autosaved {rows} rows in {self.last_stats['seconds']:.3f}s")
@@ -0,0 +1,231 @@
+"""
+Benchmarks for synthetic worlds, run headless.
+
+Usage:
+    python bench.py [--sizes 10000 100000 1000000] [--memory 100000] [--out bench.json]
+
+Every size builds a world with that many ore nodes, a tenth as many trees and a ground layer with
+as many tiles, then times rendering, cursor hit-testing, mining, Inventory.add_item, save_game and
+load_game, split into the chunks around the player (until the first frame) and the rows streamed after it. The memory benchmark measures the bytes per ore node with tracemalloc: laid out like the entities
+before they were slotted, as entity objects and as rows of the node store, which is how the world keeps them. The results are written as JSON so they can be compared between versions.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import tracemalloc
+from time import perf_counter
+import pygame as pg
+import headless
+from entities import *
+from ground import SAND
+
+def timed(function, ops: int = 1) -> dict:
+    """
+    Runs a function once and returns the timing.
+
+    Args:
+        function (callable): The function to time.
+        ops (int): The number of operations the function performs.
+
+    Returns:
+        dict: The total time in seconds, the number of operations and the time per operation in microseconds.
+    """
+    start = perf_counter()
+    function()
+    seconds = perf_counter() - start
+    return {"seconds": seconds, "ops": ops, "us_per_op": seconds / ops * 1e6}
+
+def build_world(size: int, seed: int = 0):
+    """
+    Builds a synthetic world.
+    Ore nodes fill a square around the origin, trees are scattered over the same area and the ground covers it.
+
+    Args:
+        size (int): The number of ore nodes.
+        seed (int): The seed for the random placement.
+
+    Returns:
+        World: The new world, with the player at the origin.
+    """
+    rng = random.Random(seed)
+    world = headless.create_world(f"Bench {size}")
+    side = math.ceil(math.sqrt(size))
+    half = side // 2
+    ore_types = ("Iron_Ore", "Copper_Ore", "Coal")
+    # the nodes are added as rows, like a loaded save file, so no object is kept for each of them
+    rows = [(i + 1, ore_types[i % 3], i % side - half, i // side - half, 1000) for i in range(size)]
+    rows.extend((size + i + 1, "Tree", rng.randrange(-half, half), rng.randrange(-half, half), Tree.quantity) for i in range(size // 10))
+    world.add_save_rows(rows)
+    world.add_entities([Engineer(0, 0)])
+    world.ground.fill(-half, -half, side - half, side - half, SAND)
+    return world
+
+def bench_size(size: int, frames: int, queries: int) -> dict:
+    """
+    Runs all benchmarks for one world size.
+
+    Args:
+        size (int): The number of ore nodes.
+        frames (int): The number of frames to render.
+        queries (int): The number of hit-tests, mining operations and inventory insertions.
+
+    Returns:
+        dict: The timings of each benchmark.
+    """
+    results = {}
+    holder = {}
+    results["build"] = timed(lambda: holder.setdefault("world", build_world(size)), size)
+    world = holder["world"]
+    rng = random.Random(1)
+
+    world.render() # bake the visible chunks and scale the sprites once
+    results["render"] = timed(lambda: headless.run(world, frames), frames)
+    results["render"]["rendered"] = world.render_stats["rendered"]
+    results["render"]["culled"] = world.render_stats["culled"]
+
+    width = world.surface.get_width()
+    height = world.surface.get_height()
+    positions = [(rng.randrange(width), rng.randrange(height)) for _ in range(queries)]
+    def cursor():
+        # World.cursor() prints every entity under the cursor, which would time the terminal instead of the hit-test
+        with contextlib.redirect_stdout(io.StringIO()):
+            for pos in positions:
+                world.cursor(world.entities_at(*world.screen_to_world(pos)), (0, 0, 0), pos)
+    results["cursor"] = timed(cursor, queries)
+
+    player = world.player
+    nodes = [entity for entity in world.entities_in_rect(-3, -3, 3, 3) if isinstance(entity, Depletable)]
+    def mine():
+        for i in range(queries):
+            player.inventory = Inventory(8) # keep the inventory from filling up
+            nodes[i % len(nodes)].mine(player)
+    results["mine"] = timed(mine, queries) if nodes else None
+
+    items = [IRON_ORE, COPPER_ORE, COAL]
+    inventory = Inventory(queries)
+    def add_item():
+        for i in range(queries):
+            inventory.add_item(items[i % 3], 1)
+    results["add_item"] = timed(add_item, queries)
+
+    rows = world.count_entities() + len(world.ground)
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = os.path.join(folder, "bench.db")
+        results["save_game"] = timed(lambda: world.save_game(file_path), rows)
+        loaded = headless.create_world(f"Bench {size} loaded")
+        results["load_game"] = timed(lambda: loaded.load_game(file_path), rows)
+        results["load_stream"] = timed(loaded.chunks.finish_stream, rows)
+        loaded.close_db()
+        world.close_db()
+    return results
+
+class Baseline_Node(pg.sprite.Sprite):
+    """
+    An ore node laid out the way entities were before they were slotted: a sprite that keeps its type data,
+    like the image, item name and stack size, in its instance dictionary. It is the baseline of the memory benchmark.
+    """
+
+    def __init__(self, posX: float, posY: float, quantity: float, image, item_name: str) -> None:
+        super().__init__()
+        self.posX = posX
+        self.posY = posY
+        self.world = None
+        self.id = None
+        self.image = image
+        self.icon = None
+        self.messages = []
+        self.size = (1, 1)
+        self.max_stack_size = 64
+        self.is_player = False
+        self.quantity = quantity
+        self.item_name = item_name
+
+def bench_memory(count: int) -> dict:
+    """
+    Measures the memory used by ore nodes with tracemalloc.
+
+    Args:
+        count (int): The number of ore nodes.
+
+    Returns:
+        dict: The bytes per node before entities were slotted (the baseline), as entity objects and as rows of the node store,
+            each including the list holding them, and how many times smaller than the baseline the last two are.
+    """
+    world = headless.create_world("Memory")
+    ore_types = (Iron_Ore, Copper_Ore, Coal)
+    results = {"count": count}
+    gc.collect()
+    tracemalloc.start()
+    try:
+        images = [ore_type.image for ore_type in ore_types]
+        start = tracemalloc.get_traced_memory()[0]
+        ores = [Baseline_Node(i, 0, 1000, images[i % 3], ore_types[i % 3].item_type.name) for i in range(count)]
+        results["baseline_bytes_per_node"] = (tracemalloc.get_traced_memory()[0] - start) / count
+        del ores
+        gc.collect()
+        start = tracemalloc.get_traced_memory()[0]
+        ores = [ore_types[i % 3](i, 0, 1000) for i in range(count)]
+        results["object_bytes_per_node"] = (tracemalloc.get_traced_memory()[0] - start) / count
+        del ores
+        gc.collect()
+        if world.nodes is not None:
+            start = tracemalloc.get_traced_memory()[0]
+            world.add_save_rows([(i + 1, ore_types[i % 3].__name__, i, 0, 1000) for i in range(count)])
+            gc.collect()
+            results["store_bytes_per_node"] = (tracemalloc.get_traced_memory()[0] - start) / count
+    finally:
+        tracemalloc.stop()
+    results["object_reduction"] = results["baseline_bytes_per_node"] / results["object_bytes_per_node"]
+    if "store_bytes_per_node" in results:
+        results["store_reduction"] = results["baseline_bytes_per_node"] / results["store_bytes_per_node"]
+    return results
+
+def get_version() -> str:
+    """
+    Returns the git commit of the working tree, or "unknown" outside of a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark synthetic worlds headless.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="numbers of ore nodes")
+    parser.add_argument("--frames", type=int, default=100, help="frames to render per size")
+    parser.add_argument("--queries", type=int, default=1000, help="hit-tests, mining and inventory operations per size")
+    parser.add_argument("--memory", type=int, default=100000, help="ore nodes for the memory benchmark, 0 to skip it")
+    parser.add_argument("--out", default="bench.json", help="file to write the JSON results to")
+    args = parser.parse_args()
+
+    report = {"version": get_version(),
+              "python": platform.python_version(),
+              "pygame": pg.version.ver,
+              "platform": platform.platform(),
+              "results": {}}
+    for size in args.sizes:
+        print(f"Benchmarking {size} ore nodes")
+        report["results"][str(size)] = bench_size(size, args.frames, args.queries)
+    if args.memory:
+        print(f"Measuring memory of {args.memory} ore nodes")
+        report["memory"] = bench_memory(args.memory)
+        memory = report["memory"]
+        print(f"{memory['baseline_bytes_per_node']:.0f} bytes per node before, {memory['object_bytes_per_node']:.0f} as objects "
+              f"({memory['object_reduction']:.1f}x smaller)", end="")
+        if "store_bytes_per_node" in memory:
+            print(f", {memory['store_bytes_per_node']:.0f} as rows of the node store ({memory['store_reduction']:.1f}x smaller)", end="")
+        print()
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import math
+
+# Zoom levels as multiples of the default tile size, from far to near
+ZOOM_FACTORS = (1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2)
+
+# Below this tile size in pixels ore fields and forests are drawn as solid coloured chunks instead of sprites
+LOD_TILE_SIZE = 12
+
+class Camera():
+    """
+    The view onto the world. It is centred on a point in world coordinates, follows the player and can zoom.
+    Everything that converts between world and screen coordinates goes through the camera.
+
+    Attributes:
+        world (World): The world that is viewed.
+        x (float): The x-coordinate of the centre of the view in world coordinates.
+        y (float): The y-coordinate of the centre of the view in world coordinates.
+        zoom_levels (tuple): The tile sizes in pixels of the zoom levels, from far to near.
+        zoom (int): The index of the current zoom level.
+        follow (bool): Whether the view follows the player.
+
+    Methods:
+        update(): Moves the view to the player.
+        zoom_in(), zoom_out(): Changes the zoom level.
+        world_to_screen(x, y): Converts world coordinates to pixels.
+        screen_to_world(pos): Converts pixels to world coordinates.
+        get_visible_area(): Returns the visible part of the world.
+    """
+
+    def __init__(self, world, base_tile_size: int, zoom_factors: tuple = ZOOM_FACTORS) -> None:
+        self.world = world
+        self.x = 0.0
+        self.y = 0.0
+        # tile sizes are whole pixels, so the tiles of the ground line up without gaps
+        self.zoom_levels = tuple(max(1, round(base_tile_size * factor)) for factor in zoom_factors)
+        self.zoom = zoom_factors.index(1) if 1 in zoom_factors else len(zoom_factors) - 1
+        self.follow = True
+
+    @property
+    def tile_size(self) -> int:
+        """
+        The size of a tile in pixels at the current zoom level.
+        """
+        return self.zoom_levels[self.zoom]
+
+    @property
+    def lod(self) -> bool:
+        """
+        Whether the view is zoomed out so far that sprites are replaced by solid coloured chunks.
+        """
+        return self.tile_size < LOD_TILE_SIZE
+
+    def update(self, pos: tuple = None) -> None:
+        """
+        Centres the view on the player, if it follows the player.
+
+        Args:
+            pos (tuple): The position the player is drawn at. Defaults to get_render_pos().
+        """
+        player = self.world.player
+        if self.follow and player is not None:
+            x, y = pos if pos is not None else player.get_render_pos()
+            width, height = player.get_render_size()
+            # the sprite reaches to the right and downwards from the position
+            self.x = x + width / 2
+            self.y = y - height / 2
+
+    def set_zoom(self, zoom: int) -> None:
+        """
+        Sets the zoom level, clamped to the available levels.
+
+        Args:
+            zoom (int): The index of the zoom level.
+        """
+        self.zoom = min(max(zoom, 0), len(self.zoom_levels) - 1)
+
+    def zoom_in(self) -> None:
+        self.set_zoom(self.zoom + 1)
+
+    def zoom_out(self) -> None:
+        self.set_zoom(self.zoom - 1)
+
+    def world_to_screen(self, x: float, y: float) -> tuple:
+        """
+        Converts world coordinates to a position on the surface.
+
+        Args:
+            x (float): The x-coordinate in world coordinates.
+            y (float): The y-coordinate in world coordinates. It grows upwards, while the screen y grows downwards.
+
+        Returns:
+            tuple: The position in pixels.
+        """
+        ts = self.tile_size
+        return (self.world.surface.get_width() // 2 + (x - self.x) * ts, self.world.surface.get_height() // 2 - (y - self.y) * ts)
+
+    def screen_to_world(self, pos: tuple) -> tuple:
+        """
+        Converts a position on the surface to world coordinates.
+
+        Args:
+            pos (tuple): The position in pixels.
+
+        Returns:
+            tuple: The position in world coordinates as floats.
+        """
+        ts = self.tile_size
+        return (self.x + (pos[0] - self.world.surface.get_width() // 2) / ts, self.y + (self.world.surface.get_height() // 2 - pos[1]) / ts)
+
+    def get_visible_area(self) -> tuple:
+        """
+        Returns the part of the world that is visible on the surface.
+
+        Returns:
+            tuple: The visible area in world coordinates as (left, bottom, right, top).
+        """
+        left, top = self.screen_to_world((0, 0))
+        right, bottom = self.screen_to_world(self.world.surface.get_size())
+        return (left, bottom, right, top)
+
+    def get_view(self) -> tuple:
+        """
+        Returns what the view depends on, to tell when cached renderings of it are outdated.
+        """
+        return (self.x, self.y, self.tile_size)
+
+    def get_grid_lines(self) -> tuple:
+        """
+        Returns the screen positions of the visible tile borders.
+
+        Returns:
+            tuple: Two lists of (world coordinate, pixel) pairs, for the vertical and the horizontal lines.
+        """
+        left, bottom, right, top = self.get_visible_area()
+        columns = [(x, self.world_to_screen(x, 0)[0]) for x in range(math.floor(left), math.ceil(right) + 1)]
+        rows = [(y, self.world_to_screen(0, y)[1]) for y in range(math.floor(bottom), math.ceil(top) + 1)]
+        return columns, rows
@@ -0,0 +1,477 @@
+import math
+import sqlite3
+import threading
+import queue
+try:
+    import numpy as np
+except ImportError: # chunk streaming works on the node store, which needs NumPy
+    np = None
+from ground import CHUNK_SIZE
+
+def chunk_sql(column: str) -> str:
+    """
+    Returns an SQL expression for the chunk coordinate of a position column, like math.floor(column / CHUNK_SIZE).
+    SQLite has no floor() in every build, and CAST rounds towards zero, so negative positions are corrected by one.
+
+    Args:
+        column (str): The name of the column.
+    """
+    quotient = f"{column} / {CHUNK_SIZE}.0"
+    return f"(CAST({quotient} AS INTEGER) - ({quotient} < CAST({quotient} AS INTEGER)))"
+
+def chunk_query(names: list) -> str:
+    """
+    Returns the query for the rows of a chunk with one of the given entity types. Its parameters are chunkX, chunkY and the type names.
+    The chunk columns are indexed, so the query only touches the rows of the chunk.
+
+    Args:
+        names (list): The names of the entity types.
+    """
+    return f"SELECT id, type, posX, posY, quantity FROM entities WHERE chunkX = ? AND chunkY = ? AND type IN ({', '.join('?' * len(names))})"
+
+class Chunk_Streamer(threading.Thread):
+    """
+    Reads the rows of a query on its own thread and hands them over in batches, so a large save file is loaded
+    while the game is already running. The queue holds only a few batches, so the rows that were not handed over yet don't pile up in memory.
+
+    Attributes:
+        file_path (str): The path of the save file.
+        query (str): The query for the rows.
+        params (tuple): The parameters of the query.
+        batch_size (int): The number of rows per batch.
+        batches (Queue): The batches that were read. None marks the end.
+        rows (int): The number of rows that were read so far.
+    """
+
+    def __init__(self, file_path: str, query: str, params: tuple = (), batch_size: int = 2000, max_batches: int = 8) -> None:
+        super().__init__(name="chunk streamer", daemon=True)
+        self.file_path = file_path
+        self.query = query
+        self.params = params
+        self.batch_size = batch_size
+        self.batches = queue.Queue(max_batches)
+        self.rows = 0
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        db_con = sqlite3.connect(self.file_path)
+        try:
+            cursor = db_con.execute(self.query, self.params)
+            while not self.stopped.is_set():
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                self.rows += len(rows)
+                self.put(rows)
+        except sqlite3.Error as e:
+            print(f"Streaming the save file failed: {e}")
+        finally:
+            db_con.close()
+            self.put(None)
+
+    def put(self, batch) -> None:
+        """
+        Waits until there is room for a batch, or until the streamer is stopped.
+        """
+        while not self.stopped.is_set():
+            try:
+                self.batches.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def stop(self) -> None:
+        """
+        Stops reading and waits for the thread to end. The batches that were not handed over are dropped.
+        """
+        self.stopped.set()
+        self.join()
+
+class Chunk_Reader(threading.Thread):
+    """
+    Reads evicted chunks from the save file on its own thread, so a simulation step never waits for the disk.
+    Before each read it waits for the pending writes of the autosaver, which hold the rows of the chunks that were evicted last.
+
+    Attributes:
+        autosave (Autosaver): The autosaver whose writes are waited for.
+        requests (Queue): The chunks to read as (file path, chunk position, type names) tuples. None stops the reader.
+        results (Queue): The chunks that were read as (chunk position, rows) tuples. The rows are None if reading failed.
+    """
+
+    def __init__(self, autosave) -> None:
+        super().__init__(name="chunk reader", daemon=True)
+        self.autosave = autosave
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+
+    def run(self) -> None:
+        db_con = None
+        db_path = None
+        try:
+            while True:
+                # the chunks that were requested in the meantime are read together, after waiting for the autosaver once
+                requests = [self.requests.get()]
+                while not self.requests.empty():
+                    requests.append(self.requests.get())
+                self.autosave.flush() # the rows may still be on their way to the file
+                for request in requests:
+                    if request is None:
+                        return
+                    file_path, key, names = request
+                    try:
+                        if file_path != db_path:
+                            if db_con is not None:
+                                db_con.close()
+                            db_con = sqlite3.connect(file_path)
+                            db_path = file_path
+                        rows = db_con.execute(chunk_query(names), (*key, *names)).fetchall()
+                    except sqlite3.Error as e:
+                        print(f"Reading chunk {key} failed: {e}")
+                        rows = None
+                    self.results.put((key, rows))
+        finally:
+            if db_con is not None:
+                db_con.close()
+
+    def stop(self) -> None:
+        """
+        Stops the reader after the requested chunks and waits for the thread to end. Chunks that were read but not handed over are dropped.
+        """
+        self.requests.put(None)
+        self.join()
+
+class Chunk_Manager():
+    """
+    Generates, loads and evicts the ore nodes and trees of a procedural world chunk by chunk, so only the area around
+    the player and the camera is kept in the node store, however much of the world was explored.
+
+    A chunk that is needed for the first time is generated from the seed. Chunks far from the player are evicted:
+    their changes are written to the save file by the autosaver and their rows are dropped from the node store.
+    When the player comes back, the rows are read from the save file again, on the chunk reader's thread. A world that was never saved
+    is saved into a scratch file before its first chunks are evicted, see World.save_scratch(); eviction waits until the file is written.
+
+    Attributes:
+        world (World): The world the chunks belong to.
+        generator (World_Generator): Generates new chunks, or None if the world is not procedural.
+        radius (int): The chunks within this distance of the player, in chunks, are loaded.
+        keep_radius (int): The chunks further away than this from the player and outside the view are evicted.
+        max_per_update (int): The maximum number of chunks generated or loaded per update, which bounds the cost of a step.
+        generated (set): The positions of all chunks that were ever generated.
+        loaded (set): The positions of the chunks whose rows are in the node store.
+        dirty (set): The positions of generated chunks that are not in the save file yet.
+        stats (dict): The number of chunks generated, read and evicted so far.
+        streamer (Chunk_Streamer): Reads the rows of the save file outside the first loaded area, or None when loading is done.
+        stream_batches (int): The maximum number of streamed batches added per update.
+        reader (Chunk_Reader): Reads evicted chunks from the save file, or None until the first chunk is read.
+        reading (set): The positions of the chunks that were requested from the reader and were not added yet.
+
+    Methods:
+        update(): Adds streamed rows, loads the chunks near the player and the view and evicts the far ones.
+        stream(file_path, query, params): Starts streaming rows of the save file into the world.
+        finish_stream(): Waits for the streamed rows and adds them all.
+        generate_chunk(key): Generates a chunk into the node store.
+        read_chunk(key): Requests an evicted chunk from the save file.
+        receive(): Adds the chunks that were read.
+        evict(keys): Drops chunks from the node store.
+        evicted_rows(): Returns the rows of the evicted chunks.
+        has_evicted(): Whether some chunks only exist in the save file.
+    """
+
+    def __init__(self, world, radius: int = 3, keep_radius: int = 5, max_per_update: int = 2, stream_batches: int = 1) -> None:
+        self.world = world
+        self.generator = None
+        self.radius = radius
+        self.keep_radius = keep_radius
+        self.max_per_update = max_per_update
+        self.generated = set()
+        self.loaded = set()
+        self.dirty = set()
+        self.stats = {"generated": 0, "read": 0, "evicted": 0}
+        self.last_area = None # the wanted area of the last update, to skip updates while nothing moved
+        self.streamer = None
+        self.stream_batches = stream_batches
+        self.db_con = None
+        self.db_path = None
+        self.reader = None
+        self.reading = set()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether the world is procedural and has a node store to put the chunks into.
+        """
+        return self.generator is not None and self.world.nodes is not None
+
+    @staticmethod
+    def chunk_of(x: float, y: float) -> tuple:
+        """
+        Returns the position of the chunk a world position is in, in chunks.
+        """
+        return (math.floor(x / CHUNK_SIZE), math.floor(y / CHUNK_SIZE))
+
+    def get_area(self) -> tuple:
+        """
+        Returns the chunks in view and the chunks around the player, as (centre, view, around) with the rectangles of chunk positions
+        as (left, bottom, right, top). The wanted chunks are the union of both rectangles, not the box around them,
+        so a camera that looks far away from the player does not load everything in between. Without a player the view alone decides.
+        """
+        left, bottom, right, top = self.world.camera.get_visible_area()
+        view = (*self.chunk_of(left, bottom), *self.chunk_of(right, top))
+        player = self.world.player
+        if player is None:
+            return (self.chunk_of(self.world.camera.x, self.world.camera.y), view, view)
+        centerX, centerY = self.chunk_of(player.posX, player.posY)
+        return ((centerX, centerY), view, (centerX - self.radius, centerY - self.radius, centerX + self.radius, centerY + self.radius))
+
+    @staticmethod
+    def get_chunks(rect: tuple) -> set:
+        """
+        Returns the chunk positions in a rectangle of chunk positions given as (left, bottom, right, top).
+        """
+        left, bottom, right, top = rect
+        return {(x, y) for x in range(left, right + 1) for y in range(bottom, top + 1)}
+
+    def update(self) -> None:
+        """
+        Adds the next streamed rows and the chunks that were read, then generates or requests the missing chunks near the player
+        and the view, nearest first, and evicts the chunks that are far away. At most max_per_update chunks are generated or requested
+        per call; the rest follow in the next steps.
+        """
+        if self.streamer is not None:
+            self.drain(self.stream_batches)
+        if not self.enabled:
+            return
+        if self.reading:
+            self.receive()
+        area = self.get_area()
+        if area == self.last_area:
+            return
+        (centerX, centerY), view, around = area
+        wanted = self.get_chunks(view) | self.get_chunks(around)
+        missing = sorted(wanted - self.loaded - self.reading, key=lambda key: max(abs(key[0] - centerX), abs(key[1] - centerY)))
+        for key in missing[:self.max_per_update]:
+            if key in self.generated:
+                self.read_chunk(key)
+            else:
+                self.generate_chunk(key)
+        if len(missing) <= self.max_per_update:
+            self.last_area = area # every wanted chunk is loaded now
+        far = {key for key in self.loaded - wanted if max(abs(key[0] - centerX), abs(key[1] - centerY)) > self.keep_radius}
+        if far:
+            if not self.world.world_saved:
+                self.world.save_scratch()
+            elif self.world.scratch_fp is None or self.world.scratch_ready.is_set():
+                # the rows stay in memory until the scratch file they are evicted into is on disk
+                self.evict(far)
+
+    def generate_chunk(self, key: tuple) -> None:
+        """
+        Generates a chunk with the generator and adds its nodes to the node store with new IDs.
+
+        Args:
+            key (tuple): The position of the chunk in chunks.
+        """
+        nodes = self.world.nodes
+        groups = self.generator.generate_chunk(*key)
+        self.generated.add(key)
+        self.loaded.add(key)
+        self.dirty.add(key)
+        self.stats["generated"] += 1
+        if not groups:
+            return
+        codes = np.concatenate([np.full(len(xs), nodes.codes[cls], np.int8) for cls, xs, ys, quantities in groups])
+        xs = np.concatenate([group[1] for group in groups])
+        ys = np.concatenate([group[2] for group in groups])
+        quantities = np.concatenate([group[3] for group in groups])
+        start = self.world.next_id
+        self.world.next_id += len(xs)
+        nodes.extend(list(range(start, self.world.next_id)), codes, xs, ys, quantities)
+        self.world.invalidate_background()
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Returns a connection to the current save file for reading all evicted chunks at once, e.g. for a snapshot.
+        It is separate from the world's connection, since it is used on the simulation thread when that runs on its own.
+        """
+        file_path = self.world.current_save_fp
+        if self.db_con is None or self.db_path != file_path:
+            if self.db_con is not None:
+                self.db_con.close()
+            self.db_con = sqlite3.connect(file_path, check_same_thread=False)
+            self.db_path = file_path
+        return self.db_con
+
+    def query_chunk(self, key: tuple) -> list:
+        """
+        Returns the save file rows of the ore nodes and trees of a chunk.
+
+        Args:
+            key (tuple): The position of the chunk in chunks.
+
+        Returns:
+            list: The rows as (id, type, posX, posY, quantity) tuples.
+        """
+        names = self.world.nodes.type_names
+        return self.connect().execute(chunk_query(names), (*key, *names)).fetchall()
+
+    def read_chunk(self, key: tuple) -> None:
+        """
+        Requests the rows of an evicted chunk from the chunk reader. A later update() adds them to the node store.
+
+        Args:
+            key (tuple): The position of the chunk in chunks.
+        """
+        if self.reader is None:
+            self.reader = Chunk_Reader(self.world.autosave)
+            self.reader.start()
+        self.reader.requests.put((self.world.current_save_fp, key, list(self.world.nodes.type_names)))
+        self.reading.add(key)
+
+    def receive(self) -> None:
+        """
+        Adds the rows of the chunks that the chunk reader has read so far to the node store, without waiting for the others.
+        """
+        nodes = self.world.nodes
+        codes = {name: code for code, name in enumerate(nodes.type_names)}
+        while True:
+            try:
+                key, rows = self.reader.results.get(block=False)
+            except queue.Empty:
+                return
+            self.reading.discard(key)
+            if rows is None:
+                self.last_area = None # request it again in the next update
+                continue
+            self.loaded.add(key)
+            self.stats["read"] += 1
+            if rows:
+                ids, types, xs, ys, quantities = zip(*rows)
+                nodes.extend(ids, [codes[name] for name in types], xs, ys, quantities, changed=False)
+                self.world.invalidate_background()
+
+    def evict(self, keys: set) -> None:
+        """
+        Writes the changes of the world to the save file and drops the rows of chunks from the node store.
+        Chunks with a node that is showing a message stay, so the message is not lost.
+
+        Args:
+            keys (set): The positions of the chunks.
+        """
+        nodes = self.world.nodes
+        keys = set(keys)
+        for entity in nodes.wrappers.values():
+            if entity.messages:
+                keys.discard(self.chunk_of(entity.posX, entity.posY))
+        if not keys:
+            return
+        # the evicted rows must be in the save file before they are dropped
+        if nodes.dirty or self.world.removed_ids or self.dirty:
+            self.world.autosave.save()
+        n = nodes.count
+        chunkX = np.floor(nodes.posX[:n] / CHUNK_SIZE).astype(np.int64)
+        chunkY = np.floor(nodes.posY[:n] / CHUNK_SIZE).astype(np.int64)
+        wanted = [nodes.cell_key(x, y) for x, y in keys]
+        rows = np.flatnonzero(np.isin(nodes.cell_key(chunkX, chunkY), wanted) & nodes.alive[:n])
+        nodes.remove_rows(rows)
+        self.loaded -= keys
+        self.stats["evicted"] += len(keys)
+        self.world.invalidate_background()
+
+    def stream(self, file_path: str, query: str, params: tuple = ()) -> None:
+        """
+        Starts reading the rows of a query from the save file on a background thread. update() adds them to the world batch by batch.
+
+        Args:
+            file_path (str): The path of the save file.
+            query (str): The query for the rows, returning (id, type, posX, posY, quantity).
+            params (tuple): The parameters of the query.
+        """
+        self.stop_stream()
+        self.streamer = Chunk_Streamer(file_path, query, params)
+        self.streamer.start()
+
+    def drain(self, max_batches: int, block: bool = False) -> None:
+        """
+        Adds up to max_batches streamed batches to the world.
+
+        Args:
+            max_batches (int): The maximum number of batches.
+            block (bool): Whether to wait for batches that were not read yet.
+        """
+        for _ in range(max_batches):
+            try:
+                rows = self.streamer.batches.get(block=block)
+            except queue.Empty:
+                return
+            if rows is None:
+                print(f"Streamed {self.streamer.rows} rows of the save file")
+                self.streamer = None
+                return
+            self.world.add_save_rows(rows)
+
+    def finish_stream(self) -> None:
+        """
+        Waits for the rest of the streamed rows and adds them, e.g. before the whole world is saved.
+        """
+        while self.streamer is not None:
+            self.drain(self.streamer.batches.maxsize, block=True)
+
+    def stop_stream(self) -> None:
+        """
+        Stops streaming and drops the rows that were not added yet.
+        """
+        if self.streamer is not None:
+            self.streamer.stop()
+            self.streamer = None
+
+    def evicted_rows(self) -> list:
+        """
+        Returns the save file rows of all evicted chunks, after the pending changes were written to the save file.
+
+        Returns:
+            list: The rows as (id, type, posX, posY, quantity) tuples.
+        """
+        if not self.has_evicted() or not self.world.world_saved:
+            return []
+        self.world.autosave.save()
+        self.world.autosave.flush()
+        rows = []
+        for key in self.generated - self.loaded:
+            rows.extend(self.query_chunk(key))
+        return rows
+
+    def has_evicted(self) -> bool:
+        """
+        Returns whether some generated chunks are only in the save file and not in the node store.
+        """
+        return len(self.generated) > len(self.loaded)
+
+    def stop_reader(self) -> None:
+        """
+        Stops the chunk reader and drops the chunks it has read.
+        """
+        if self.reader is not None:
+            self.reader.stop()
+            self.reader = None
+        self.reading = set()
+
+    def clear(self) -> None:
+        """
+        Forgets all chunks and stops streaming and reading. The generator is kept.
+        """
+        self.stop_stream()
+        self.stop_reader()
+        self.generated = set()
+        self.loaded = set()
+        self.dirty = set()
+        self.last_area = None
+
+    def close(self) -> None:
+        """
+        Stops the chunk reader and closes the connection for reading chunks.
+        """
+        self.stop_reader()
+        if self.db_con is not None:
+            self.db_con.close()
+            self.db_con = None
+            self.db_path = None
@@ -1,5 +1,7 @@
 import pygame as pg
 import math
+from assets import assets, Asset
+from items import *
 
 class Message():
     """
@@ -11,6 +13,8 @@ class Message():
         expiration (datetime): The expiration time of the message.
     """
 
+    __slots__ = ("content", "expiration")
+
     def __init__(self, content, expiration):
         self.content = content
         self.expiration = expiration
@@ -18,93 +22,204 @@ class Message():
 class Inventory():
     """
     Represents an inventory with a limited number of slots for storing items.
+    Items are stored by their Item_Type, never as world entities. An index maps each item type to its slots and a running total,
+    so looking up the stacks of an item and counting it take constant time instead of a scan over all slots.
+    Wherever an item is expected, an Item_Type, its name or an entity that is mined as that item can be passed.
 
     Attributes:
-        slots (list): A list of slots in the inventory, where each slot is represented as a list containing an item and its quantity.
+        slots (list): A list of slots in the inventory, where each slot is represented as a list containing an item type and its quantity.
         max_slots (int): The maximum number of slots in the inventory.
+        index (dict): The slots of each item type, in slot order. The slot lists are shared with self.slots.
+        totals (dict): The total quantity of each item type.
+        dirty (bool): Whether the inventory changed since the last save.
+        version (int): Incremented on every change, so views of the inventory know when to redraw.
 
     Methods:
         add_item(item, quantity): Adds an item to the inventory with the specified quantity.
         remove_item(item, quantity): Removes an item from the inventory with the specified quantity.
+        add_many(items): Adds several items at once, or none of them if they do not fit.
+        remove_many(items): Removes several items at once, or none of them if some are missing.
+        transfer_to(other, items): Moves items to another inventory.
+        count(item): Returns the total quantity of an item.
     """
 
+    __slots__ = ("slots", "max_slots", "index", "totals", "dirty", "version")
+
     def __init__(self, max_slots):
         self.slots = []
         self.max_slots = max_slots
+        self.index = {}
+        self.totals = {}
+        self.dirty = True
+        self.version = 0
+
+    @staticmethod
+    def item_type(item) -> Item_Type:
+        """
+        Returns the item type an item is stored as.
+
+        Args:
+            item (Item_Type, str or Entity): The item type, its name, or an entity that is mined as the item.
+
+        Raises:
+            ValueError: If there is no item type with that name.
+        """
+        if isinstance(item, Item_Type):
+            return item
+        if isinstance(item, str):
+            return get_item_type(item)
+        return item.item_type
+
+    def count(self, item) -> int:
+        """
+        Returns the total quantity of an item in the inventory.
+
+        Args:
+            item (Item_Type, str or Entity): The item.
+
+        Returns:
+            int: The quantity, 0 if the item is not in the inventory.
+        """
+        return self.totals.get(self.item_type(item), 0)
+
+    def slots_needed(self, item, quantity: int) -> int:
+        """
+        Returns the number of new slots needed to add a quantity of an item, after the existing stacks are filled up.
+        """
+        item = self.item_type(item)
+        space = sum(item.max_stack_size - slot[1] for slot in self.index.get(item, ()))
+        return max(0, -(-(quantity - space) // item.max_stack_size))
 
     def add_item(self, item: object, quantity: int) -> None:
         """
         Adds an item to the inventory with the specified quantity.
+        Existing stacks of the item are filled up first, the rest goes into new slots.
 
         Args:
-            item (Entity): The item to be added.
+            item (Item_Type, str or Entity): The item to be added.
             quantity (int): The quantity of the item to be added.
 
         Raises:
-            Exception: If the inventory is full and there are no empty slots available.
+            Exception: If the inventory is full and there are no empty slots available. Nothing is added in that case.
 
         Returns:
             None
         """
-        # Iterate through the slots in the inventory
-        for slot in self.slots:
-            # Check if the item in the slot matches the item to be added and there is space left in the slot
-            if slot[0].item_name == item.item_name and slot[1] < item.max_stack_size:
-                space_left = item.max_stack_size - slot[1]
-                # If the quantity to be added is less than or equal to the space left in the slot, add the quantity to the slot
-                if quantity <= space_left:
-                    slot[1] += quantity
-                    return
-                else:
-                    # If the quantity to be added is more than the space left in the slot, fill the slot to its maximum capacity
-                    slot[1] = item.max_stack_size
-                    quantity -= space_left
-        # Calculate the number of empty slots in the inventory
-        empty_slots = self.max_slots - len(self.slots)
-        # If there are empty slots in the inventory
-        if empty_slots > 0:
-            # If the quantity to be added is less than or equal to the maximum stack size of the item, add the item to a new slot
-            if quantity <= item.max_stack_size:
-                self.slots.append([item, quantity])
+        if self.slots_needed(item, quantity) > self.max_slots - len(self.slots):
+            raise Exception("Inventory is full")
+        self.dirty = True
+        self.version += 1
+        item = self.item_type(item)
+        self.totals[item] = self.totals.get(item, 0) + quantity
+        stacks = self.index.setdefault(item, [])
+        # Fill up the stacks of the item that have space left
+        for slot in stacks:
+            if quantity == 0:
                 return
-            else:
-                # If the quantity to be added is more than the maximum stack size of the item, add the item to multiple slots
-                num_stacks = quantity // item.max_stack_size
-                remainder = quantity % item.max_stack_size
-                for _ in range(num_stacks):
-                    self.slots.append([item, item.max_stack_size])
-                if remainder > 0:
-                    self.slots.append([item, remainder])
-                return
-        # If there are no empty slots in the inventory, raise an exception
-        raise Exception("Inventory is full")
+            added = min(item.max_stack_size - slot[1], quantity)
+            slot[1] += added
+            quantity -= added
+        # Put the rest into new slots, a full stack each
+        while quantity > 0:
+            slot = [item, min(quantity, item.max_stack_size)]
+            quantity -= slot[1]
+            self.slots.append(slot)
+            stacks.append(slot)
 
     def remove_item(self, item: object, quantity: int) -> None:
         """
         Removes an item from the inventory with the specified quantity.
 
         Args:
-            item (Entity): The item to be removed.
+            item (Item_Type, str or Entity): The item to be removed.
             quantity (int): The quantity of the item to be removed.
 
         Raises:
-            Exception: If the item is not found in the inventory.
+            Exception: If the item is not found in the inventory, or not in that quantity. Nothing is removed in that case.
 
         Returns:
             None
         """
-        for slot in self.slots:
-            if slot[0] == item:
-                if slot[1] > quantity:
-                    slot[1] -= quantity
-                    return
-                elif slot[1] == quantity:
-                    self.slots.remove(slot)
-                    return
-                else:
-                    quantity -= slot[1]
-                    self.slots.remove(slot)
-        raise Exception("Item not found in inventory")
+        key = self.item_type(item)
+        if self.totals.get(key, 0) < quantity:
+            raise Exception("Item not found in inventory")
+        self.dirty = True
+        self.version += 1
+        self.totals[key] -= quantity
+        stacks = self.index[key]
+        # take from the first stacks, like the player would
+        while quantity > 0:
+            slot = stacks[0]
+            removed = min(slot[1], quantity)
+            slot[1] -= removed
+            quantity -= removed
+            if slot[1] == 0:
+                stacks.pop(0)
+                self.slots.remove(slot)
+        if not stacks:
+            del self.index[key]
+            del self.totals[key]
+
+    def add_many(self, items) -> None:
+        """
+        Adds several items at once. Either all of them fit or nothing is added.
+
+        Args:
+            items (iterable): The items as (item type, quantity) pairs.
+
+        Raises:
+            Exception: If the items do not fit into the inventory.
+        """
+        items = list(items)
+        quantities = {}
+        for item, quantity in items:
+            item = self.item_type(item)
+            quantities[item] = quantities.get(item, 0) + quantity
+        if sum(self.slots_needed(item, quantity) for item, quantity in quantities.items()) > self.max_slots - len(self.slots):
+            raise Exception("Inventory is full")
+        for item, quantity in items:
+            self.add_item(item, quantity)
+
+    def remove_many(self, items) -> None:
+        """
+        Removes several items at once. Either all of them are in the inventory or nothing is removed.
+
+        Args:
+            items (iterable): The items as (item type, quantity) pairs.
+
+        Raises:
+            Exception: If an item is not in the inventory in the requested quantity.
+        """
+        items = list(items)
+        quantities = {}
+        for item, quantity in items:
+            key = self.item_type(item)
+            quantities[key] = quantities.get(key, 0) + quantity
+        for key, quantity in quantities.items():
+            if self.totals.get(key, 0) < quantity:
+                raise Exception("Item not found in inventory")
+        for item, quantity in items:
+            self.remove_item(item, quantity)
+
+    def transfer_to(self, other: "Inventory", items=None) -> None:
+        """
+        Moves items to another inventory. Nothing is moved if they do not fit.
+
+        Args:
+            other (Inventory): The inventory to move the items to.
+            items (iterable): The items as (item type, quantity) pairs. Defaults to the whole inventory.
+
+        Raises:
+            Exception: If the items are not in this inventory or do not fit into the other one.
+        """
+        if items is None:
+            items = list(self.totals.items())
+        self.remove_many(items)
+        try:
+            other.add_many(items)
+        except Exception:
+            self.add_many(items) # put them back, they fitted before
+            raise
 
     def __iter__(self):
         """
@@ -116,36 +231,63 @@ class Inventory():
     def items(self):
         return self.slots
 
-class Entity(pg.sprite.Sprite):
+class Entity():
     """
     Represents an entity in the game world.
+    Entities are slotted and only hold their own state. Everything that is the same for all entities of a type
+    (image, size, item type) is a class attribute, so it is stored once per type instead of once per entity.
 
     Attributes:
         posX (int): The X position of the entity.
         posY (int): The Y position of the entity.
         world (World): The world the entity belongs to.
-        id (int): The unique identifier of the entity.
-        image (Surface): The image of the entity.
-        icon (Surface): The icon of the entity.
-        messages (list): The list of messages associated with the entity.
-        size (tuple): The size of the entity.
-        max_stack_size (int): The maximum stack size of the entity.
+        id (int): The unique identifier of the entity, assigned by the world. It is stable across save and load.
+        messages (list): The list of messages associated with the entity. Entities without messages share an empty tuple.
+        rect (Rect): Where the entity was last drawn on the game surface.
+
+    Class attributes:
+        image (Surface): The image of the entity type.
+        size (tuple): The size of the entity type in tiles.
+        item_type (Item_Type): The item the entity type is mined as.
+        lod_color (tuple): The colour the entity type is drawn in when the camera is zoomed out far.
+        is_player (bool): Whether entities of the type are the player.
+        layer (int): The render layer of the entity type. Lower layers are drawn first.
     """
 
+    __slots__ = ("posX", "posY", "world", "id", "messages", "rect")
+
+    image = None
+    size = (1, 1)
+    item_type = None
+    lod_color = (255, 255, 255)
+    is_player = False
+    layer = 1
+
     def __init__(self, posX: float, posY: float) -> None:
-        super().__init__()
         self.posX = posX
         self.posY = posY
         self.world = None
-        self.id = id(self)
-        self.image = None
-        self.icon = None
-        self.messages = []
-        self.size = (1, 1)
-        self.max_stack_size = 64
+        self.id = None
+        self.messages = ()
+        self.rect = None
 
     def __repr__(self) -> str:
-        return super().__repr__() + f" ID: {self.id} at {self.posX}, {self.posY}"
+        return f"<{self.__class__.__name__}> ID: {self.id} at {self.posX}, {self.posY}"
+
+    @classmethod
+    def from_save(cls, posX: float, posY: float, quantity: int) -> "Entity":
+        """
+        Creates an entity from a row of a save file.
+
+        Args:
+            posX (float): The saved x-coordinate.
+            posY (float): The saved y-coordinate.
+            quantity (int): The saved quantity, -1 for entities without a quantity.
+
+        Returns:
+            Entity: The new entity.
+        """
+        return cls(posX, posY)
 
     def set_message(self, message: str) -> None:
         """
@@ -157,38 +299,109 @@ class Entity(pg.sprite.Sprite):
         Returns:
         None
         """
-        self.messages.insert(0, Message(message, self.world.time.get_ticks() + 2500))
+        if not self.messages:
+            self.messages = [] # the shared empty tuple is replaced by a list on the first message
+        message = Message(message, self.world.get_ticks() + 2500)
+        self.messages.insert(0, message)
+        # the world's scheduler removes the message when it expires, so rendering does not have to check
+        self.world.schedule(2500, self.drop_message, message)
+
+    def drop_message(self, message: Message) -> None:
+        """
+        Removes a message from the list. Called by the world's scheduler when the message expires.
 
-    def render_messages(self) -> None:
+        Args:
+            message (Message): The message to remove.
+        """
+        if message in self.messages:
+            self.messages.remove(message)
+            if not self.messages:
+                self.messages = ()
+
+    def render_messages(self, contents=None) -> None:
         """
         Renders the messages on the game surface.
 
         This method iterates through the list of messages and renders each message on the game surface.
-        It also removes any expired messages from the list.
+        Expired messages were already removed by the world's scheduler.
 
         Args:
-            None
+            contents (tuple): The message texts to draw, e.g. from a render snapshot. Defaults to the entity's current messages.
 
         Returns:
             None
         """
-        c_time = self.world.time.get_ticks()
-        offset = 1
-        self.messages = [message for message in self.messages if c_time < message.expiration]
-        for message in self.messages:
-            self.world.surface.blit(self.world.font.render(message.content, True, pg.Color('white')), (self.rect.left + 50 + 25 * offset, self.rect.top + 25 * -offset))
-            offset += 1
+        if contents is None:
+            contents = [message.content for message in self.messages]
+        for text, pos in self.layout_messages(self.rect, contents):
+            self.world.surface.blit(text, pos)
 
-    def render(self) -> None:
+    def layout_messages(self, rect: pg.Rect, contents):
+        """
+        Returns the rendered message texts and where they are drawn, stacked diagonally above the entity.
+
+        Args:
+            rect (Rect): The rect of the entity on the game surface.
+            contents (iterable): The message texts.
+
+        Returns:
+            list: (text surface, position) tuples.
+        """
+        return [(assets.render_text(self.world.font, content, True, pg.Color('white')), (rect.left + 50 + 25 * offset, rect.top + 25 * -offset))
+                for offset, content in enumerate(contents, start=1)]
+
+    def get_dirty_rect(self, pos: tuple = None) -> pg.Rect:
+        """
+        Returns the area of the game surface that render() draws to, including the messages.
+
+        Args:
+            pos (tuple): The position the entity is drawn at. Defaults to get_render_pos().
+
+        Returns:
+            Rect: The area in pixels.
+        """
+        width, height = self.get_render_size()
+        ts = self.world.tile_size
+        posX, posY = pos if pos is not None else self.get_render_pos()
+        blitX, blitY = self.world.camera.world_to_screen(posX, posY)
+        # one extra pixel for the rounding of the scaled image
+        rect = pg.Rect(math.floor(blitX), math.floor(blitY), math.ceil(ts * width) + 1, math.ceil(ts * height) + 1)
+        texts = self.layout_messages(rect, [message.content for message in self.messages])
+        if texts:
+            rect = rect.unionall([text.get_rect(topleft=text_pos) for text, text_pos in texts])
+        # a margin for positions that are rounded differently when drawing
+        return rect.inflate(4, 4)
+
+    def get_render_size(self) -> tuple:
+        """
+        Returns the size the entity is drawn at, in tiles.
+        The player sprite is one tile wide and keeps the aspect ratio of its spritesheet frames.
+        """
+        if self.is_player:
+            return (1, 3.459)
+        return self.size
+
+    def get_render_pos(self) -> tuple:
+        """
+        Returns the position the entity is drawn at. Moving entities interpolate between simulation steps.
+        """
+        return (self.posX, self.posY)
+
+    def render(self, pos: tuple = None, messages: tuple = None) -> None:
         """
         Renders the entity on the game surface.
 
+        Args:
+            pos (tuple): The position to draw the entity at. Defaults to get_render_pos().
+            messages (tuple): The message texts to draw. Defaults to the entity's current messages.
+
         Raises:
             Exception: If the entity is not in a world or if it has no image.
 
         Notes:
             - If the entity is the player, the image is scaled to a fixed aspect ratio.
             - If the entity is not the player, the image is scaled based on its size.
+            - Scaled images come from the shared asset cache; self.image is never overwritten.
             - The entity is blitted onto the game surface at the appropriate position.
             - If the entity has any messages, they are rendered as well.
             - The entity's rect attribute is updated to match the blitted position.
@@ -198,26 +411,18 @@ class Entity(pg.sprite.Sprite):
         elif self.image is None:
             raise Exception("Entity has no image")
         else:
-            if self.is_player:
-                # the math behind this:
-                # 1. the aspect ratio of the image is 512/148
-                # 2. the aspect ratio of the screen is 16/9
-                # 3. the image is scaled to the height of the screen
-                # 4. the width of the image is calculated based on the aspect ratio
-                # 5. the image is centered on the screen
-                self.image = pg.transform.scale(self.image, [self.world.tile_size, self.world.tile_size * 3.459]) # fixed aspect ratio (512/148)
-            else:
-                # and here:
-                # 1. the image is scaled based on the size of the entity
-                self.image = pg.transform.scale(self.image, [self.world.tile_size * self.size[0], self.world.tile_size * self.size[1]])
-            centerX = self.world.surface.get_width() // 2
-            centerY = self.world.surface.get_height() // 2
+            # the player keeps a fixed aspect ratio (512/148), everything else is scaled based on the size of the entity
+            width, height = self.get_render_size()
+            image = assets.scale(self.image, [self.world.tile_size * width, self.world.tile_size * height])
             # blit is the term for drawing one image onto another
-            blitX = centerX + self.posX * self.world.tile_size
-            blitY = centerY - self.posY * self.world.tile_size
-            self.world.surface.blit(self.image, (blitX, blitY))
-            self.render_messages() if self.messages else None
-            self.rect = self.image.get_rect(top=blitY, left=blitX)
+            posX, posY = pos if pos is not None else self.get_render_pos()
+            blitX, blitY = self.world.camera.world_to_screen(posX, posY)
+            self.world.surface.blit(image, (blitX, blitY))
+            self.rect = image.get_rect(top=blitY, left=blitX)
+            if messages is not None:
+                self.render_messages(messages)
+            elif self.messages:
+                self.render_messages()
             # print(self.rect, self.__repr__())
             # print(self.ret)
 
@@ -229,35 +434,56 @@ class Engineer(Entity):
     - posX (float): The x-coordinate of the engineer's position.
     - posY (float): The y-coordinate of the engineer's position.
     - spritesheet (Surface): The spritesheet image of the engineer.
+    - image (Surface): The current frame of the spritesheet, depending on the heading.
     - is_player (bool): Indicates whether the engineer is controlled by the player.
     - inventory (Inventory): The inventory of the engineer.
+    - prevX (float): The x-coordinate before the last simulation step.
+    - prevY (float): The y-coordinate before the last simulation step.
 
     Methods:
     - __init__(self, posX: float, posY: float) -> None: Initializes a new instance of the Engineer class.
-    - move(self): Moves the engineer based on the user's input.
+    - move(self, dt): Moves the engineer based on the user's input.
     - update_rotation(self, heading): Updates the engineer's rotation based on the heading angle.
     """
 
+    __slots__ = ("image", "prevX", "prevY", "inventory")
+
+    spritesheet = Asset("engineer_spritesheet.tga")
+    is_player = True
+
     def __init__(self, posX: float, posY: float, inventory: Inventory = None) -> None:
         super().__init__(posX, posY)
-        self.spritesheet = pg.image.load("../factory-game/engineer_spritesheet.tga")
         self.update_rotation(-90)
-        self.is_player = True
+        self.prevX = posX
+        self.prevY = posY
         if inventory:
             self.inventory = inventory
         else:
             self.inventory = Inventory(8)
 
-    def move(self) -> None:
+    # Walking speed in tiles per second
+    speed = 2.5
+
+    def get_render_pos(self) -> tuple:
+        # interpolate between the last two simulation steps, so movement looks smooth at any frame rate
+        alpha = self.world.alpha
+        return (self.prevX + (self.posX - self.prevX) * alpha, self.prevY + (self.posY - self.prevY) * alpha)
+
+    def move(self, dt: float) -> None:
         """
         Move the entity based on the keyboard input.
 
         The entity's movement is determined by the keys pressed by the user.
         The entity can move in eight directions: left, right, up, down, and the four diagonal directions.
 
+        Args:
+            dt (float): The length of the simulation step in seconds.
+
         Returns:
             None
         """
+        self.prevX = self.posX
+        self.prevY = self.posY
         keystate = pg.key.get_pressed()
         if keystate[pg.K_LEFT] and keystate[pg.K_RIGHT] and keystate[pg.K_UP] and keystate[pg.K_DOWN]:
             dir = (0, 0)
@@ -285,12 +511,14 @@ class Engineer(Entity):
             dir = (0, 0)
         if dir != (0, 0):
             heading = math.degrees(math.atan2(dir[1], dir[0]))
-            velocity = 2.5 / 60  # 5 tiles/second at 60 ticks
+            velocity = self.speed * dt
             delta_x = velocity * math.cos(math.radians(heading))
             delta_y = velocity * math.sin(math.radians(heading))
             self.posX += delta_x
             self.posY += delta_y
             self.update_rotation(heading)
+            if self.world is not None:
+                self.world.update_entity(self)
 
     def update_rotation(self, heading: int) -> None:
         """
@@ -303,21 +531,21 @@ class Engineer(Entity):
             None
         """
         if heading == 0:
-            self.image = self.spritesheet.subsurface((256*3, 0, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (256*3, 0, 148, 512))
         elif heading == 45:
-            self.image = self.spritesheet.subsurface((256*2, 512, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (256*2, 512, 148, 512))
         elif heading == 90:
-            self.image = self.spritesheet.subsurface((0, 512, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (0, 512, 148, 512))
         elif heading == 135:
-            self.image = self.spritesheet.subsurface((256, 512, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (256, 512, 148, 512))
         elif heading == 180:
-            self.image = self.spritesheet.subsurface((256*3, 512, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (256*3, 512, 148, 512))
         elif heading == -135:
-            self.image = self.spritesheet.subsurface((256*2, 0, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (256*2, 0, 148, 512))
         elif heading == -90:
-            self.image = self.spritesheet.subsurface((0, 0, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (0, 0, 148, 512))
         elif heading == -45:
-            self.image = self.spritesheet.subsurface((256, 0, 148, 512))
+            self.image = assets.subsurface("engineer_spritesheet.tga", (256, 0, 148, 512))
 
 class Tile(Entity):
     """
@@ -330,10 +558,10 @@ class Tile(Entity):
         is_player (bool): Indicates whether the tile is the player's tile.
     """
 
-    def __init__(self, posX: float, posY: float) -> None:
-        super().__init__(posX, posY)
-        self.image = pg.image.load("../factory-game/sand.jpg")
-        self.is_player = False
+    __slots__ = ()
+
+    image = Asset("sand.jpg")
+    layer = 0
 
 class Depletable(Entity):
     """
@@ -345,15 +573,18 @@ class Depletable(Entity):
         quantity (int): The initial quantity of the depletable entity.
         image: The image representation of the entity.
         is_player (bool): Indicates whether the entity is the player.
-        item_name: The name of the item associated with the entity.
+        item_type (Item_Type): The item the entity is mined as.
     """
 
+    __slots__ = ("quantity",)
+
     def __init__(self, posX: float, posY: float, quantity: float) -> None:
         super().__init__(posX, posY)
-        self.image = None
-        self.is_player = False
         self.quantity = quantity
-        self.item_name = None
+
+    @classmethod
+    def from_save(cls, posX: float, posY: float, quantity: int) -> "Depletable":
+        return cls(posX, posY, quantity)
 
     def mine(self, miner: Engineer) -> None:
         """
@@ -365,10 +596,12 @@ class Depletable(Entity):
         player_dist = pg.math.Vector2(self.posX, self.posY).distance_to((self.world.player.posX, self.world.player.posY))
         if player_dist < 5:
             self.quantity -= 1
-            miner.inventory.add_item(self, 1)
-            self.world.player.set_message(f"Collected 1 {self.item_name}")
+            miner.inventory.add_item(self.item_type, 1)
+            self.world.player.set_message(f"Collected 1 {self.item_type.name}")
             if self.quantity == 0:
                 self.world.remove_entity(self)
+            else:
+                self.world.update_entity(self, moved=False)
 
 class Mineable(Entity):
     """
@@ -379,21 +612,16 @@ class Mineable(Entity):
         posY (int): The y-coordinate of the entity's position.
         image: The image associated with the entity.
         is_player (bool): Indicates whether the entity is a player.
-        item_name: The name of the item that can be mined from the entity.
-        max_stack_size (int): The maximum stack size for the mined item.
-        quantity (int): The quantity of the mined item.
+        item_type (Item_Type): The item that can be mined from the entity.
+        quantity (int): The quantity of the mined item, the same for all entities of a type.
 
     Methods:
         mine(miner): Mines the entity and adds the mined item to the miner's inventory.
     """
 
-    def __init__(self, posX: float, posY: float) -> None:
-        super().__init__(posX, posY)
-        self.image = None
-        self.is_player = False
-        self.item_name = None
-        self.max_stack_size = 64
-        self.quantity = 1
+    __slots__ = ()
+
+    quantity = 1
 
     def mine(self, miner: Engineer) -> None:
         """
@@ -407,48 +635,51 @@ class Mineable(Entity):
         """
         player_dist = pg.math.Vector2(self.posX, self.posY).distance_to((self.world.player.posX, self.world.player.posY))
         if player_dist < 5:
-            miner.inventory.add_item(self, self.quantity)
-            self.world.player.set_message(f"Collected 1 {self.item_name}")
+            miner.inventory.add_item(self.item_type, self.quantity)
+            self.world.player.set_message(f"Collected 1 {self.item_type.name}")
             self.world.remove_entity(self)
 
 class Iron_Ore(Depletable):
-    def __init__(self, posX: float, posY: float, quantity: float) -> None:
-        super().__init__(posX, posY, quantity)
-        self.image = pg.image.load("../factory-game/iron_ore.png")
-        self.item_name = "iron_ore"
+    __slots__ = ()
+    image = Asset("iron_ore.png")
+    lod_color = (104, 132, 146)
+    item_type = IRON_ORE
 
 class Copper_Ore(Depletable):
-    def __init__(self, posX: float, posY: float, quantity: float) -> None:
-        super().__init__(posX, posY, quantity)
-        self.image = pg.image.load("../factory-game/copper_ore.png")
-        self.item_name = "copper_ore"
+    __slots__ = ()
+    image = Asset("copper_ore.png")
+    lod_color = (203, 97, 53)
+    item_type = COPPER_ORE
 
 class Coal(Depletable):
-    def __init__(self, posX: float, posY: float, quantity: float) -> None:
-        super().__init__(posX, posY, quantity)
-        self.image = pg.image.load("../factory-game/coal.png")
-        self.item_name = "coal"
+    __slots__ = ()
+    image = Asset("coal.png")
+    lod_color = (20, 20, 20)
+    item_type = COAL
 
 class Tree(Mineable):
-    def __init__(self, posX: float, posY: float) -> None:
-        super().__init__(posX, posY)
-        self.size = (4, 4)
-        self.image = pg.image.load("../factory-game/tree.png")
-        self.icon = pg.image.load("../factory-game/wood.png")
-        self.is_player = False
-        self.item_name = "wood"
-        self.quantity = 5
+    __slots__ = ()
+    size = (4, 4)
+    image = Asset("tree.png")
+    lod_color = (44, 92, 36)
+    item_type = WOOD
+    quantity = 5
 
 class Cursor(Entity):
-    def __init__(self, posX: float, posY: float) -> None:
-        super().__init__(posX, posY)
-        self.image = pg.image.load("../factory-game/cursor.png")
-        self.is_player = False
+    __slots__ = ()
+    image = Asset("cursor.png")
 
 class Oven(Mineable):
-    def __init__(self, posX: float, posY: float) -> None:
-        super().__init__(posX, posY)
-        self.size = (2, 2)
-        self.image = pg.image.load("../factory-game/oven.png")
-        self.item_name = "oven"
-        self.is_player = False
\ No newline at end of file
+    __slots__ = ()
+    size = (2, 2)
+    image = Asset("oven.png")
+    item_type = OVEN
+
+# Maps the type names used in save files to entity classes.
+# Older saves used the names without underscores for the ores.
+ENTITY_TYPES = {cls.__name__: cls for cls in (Engineer, Tile, Iron_Ore, Copper_Ore, Coal, Tree, Oven)}
+ENTITY_TYPES["IronOre"] = Iron_Ore
+ENTITY_TYPES["CopperOre"] = Copper_Ore
+
+# The numerous, mostly static entity types that the world keeps in its columnar node store
+STORE_TYPES = (Iron_Ore, Copper_Ore, Coal, Tree)
@@ -0,0 +1,74 @@
+import pygame as pg
+
+class Event_Bus():
+    """
+    Dispatches pygame events to the handlers subscribed to their type.
+    Handlers are called from the highest z to the lowest, so elements drawn on top see input first.
+    A handler that returns True consumes the event and the handlers below it are not called.
+
+    Attributes:
+        handlers (dict): The handlers of each event type as sorted lists of (z, order, handler) tuples.
+
+    Methods:
+        subscribe(event_type, handler, z): Subscribes a handler to an event type.
+        unsubscribe(event_type, handler): Removes a handler from an event type.
+        dispatch(event): Passes an event to the subscribed handlers.
+        pump(): Takes all events from the pygame event queue and dispatches them.
+    """
+
+    def __init__(self) -> None:
+        self.handlers = {}
+        self.order = 0
+
+    def subscribe(self, event_type: int, handler, z: int = 0) -> None:
+        """
+        Subscribes a handler to an event type.
+
+        Args:
+            event_type (int): The pygame event type, e.g. pg.KEYDOWN.
+            handler (callable): Called with the event. Returns True to consume it.
+            z (int): The z-order of the handler. Handlers with equal z are called in subscription order.
+        """
+        handlers = self.handlers.setdefault(event_type, [])
+        handlers.append((-z, self.order, handler))
+        handlers.sort(key=lambda entry: entry[:2])
+        self.order += 1
+
+    def unsubscribe(self, event_type: int, handler) -> None:
+        """
+        Removes a handler from an event type.
+
+        Args:
+            event_type (int): The pygame event type.
+            handler (callable): The handler to remove.
+        """
+        self.handlers[event_type] = [entry for entry in self.handlers.get(event_type, []) if entry[2] != handler]
+
+    def dispatch(self, event: pg.event.Event) -> bool:
+        """
+        Passes an event to the subscribed handlers until one of them consumes it.
+
+        Args:
+            event (Event): The event to dispatch.
+
+        Returns:
+            bool: True if a handler consumed the event.
+        """
+        # copy the list, handlers may subscribe or unsubscribe while the event is dispatched
+        for z, order, handler in list(self.handlers.get(event.type, [])):
+            if handler(event):
+                return True
+        return False
+
+    def pump(self) -> list:
+        """
+        Takes all events from the pygame event queue and dispatches them.
+        This should be the only place that reads the event queue.
+
+        Returns:
+            list: The events that were dispatched.
+        """
+        events = pg.event.get()
+        for event in events:
+            self.dispatch(event)
+        return events
@@ -0,0 +1,224 @@
+import pygame as pg
+import math
+from array import array
+from collections import OrderedDict
+from assets import assets
+
+# Width and height of a chunk in tiles
+CHUNK_SIZE = 16
+
+# Tile IDs
+EMPTY = 0
+SAND = 1
+
+# Images of the tile IDs
+TILE_IMAGES = {SAND: "sand.jpg"}
+
+# Above this tile size chunks are drawn tile by tile instead of baked, a baked chunk would take 9 MB or more
+MAX_BAKED_TILE_SIZE = 48
+
+# The pixels of baked chunks that are kept, 64 MB; always more than the chunks that cover the screen at MAX_BAKED_TILE_SIZE
+MAX_BAKED_PIXELS = 1 << 24
+
+class Ground_Layer():
+    """
+    Represents the ground of the world as chunks of tile IDs.
+    Every chunk is baked into a single surface at the current tile size, so drawing the ground costs one blit per visible chunk.
+    A chunk is only baked again when one of its tiles changes or the tile size changes.
+    The baked surfaces are kept within a budget of pixels, so zooming in does not multiply their memory. Beyond MAX_BAKED_TILE_SIZE,
+    where only a few tiles fit on the screen, chunks are not baked at all and their tiles are drawn one by one.
+
+    Attributes:
+        world (World): The world the ground belongs to.
+        chunks (dict): The tile IDs of each chunk as a flat array, keyed by chunk coordinates.
+        baked (OrderedDict): The baked surfaces of recently visible chunks, keyed by chunk coordinates.
+        baked_tile_size (int): The tile size the baked surfaces were made for.
+        max_baked_pixels (int): The maximum number of pixels of the baked surfaces that are kept.
+        baked_pixels (int): The number of pixels of the baked surfaces.
+        render_stats (dict): The number of chunks blitted and baked in the last frame.
+        dirty_tiles (set): The positions of tiles that changed since the last save.
+        version (int): Incremented on every change, so cached renderings of the ground know when to redraw.
+
+    Methods:
+        get_tile(x, y): Returns the tile ID at a position.
+        set_tile(x, y, tile_id): Sets the tile ID at a position.
+        fill(left, bottom, right, top, tile_id): Sets the tile ID of an area.
+        tiles(): Iterates over all non-empty tiles.
+        render(): Renders the visible chunks.
+    """
+
+    def __init__(self, world, max_baked_pixels: int = MAX_BAKED_PIXELS) -> None:
+        self.world = world
+        self.chunks = {}
+        self.baked = OrderedDict()
+        self.baked_tile_size = None
+        self.max_baked_pixels = max_baked_pixels
+        self.baked_pixels = 0
+        self.render_stats = {"blits": 0, "baked": 0}
+        self.dirty_tiles = set()
+        self.version = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of non-empty tiles.
+        """
+        return sum(len(chunk) - chunk.count(EMPTY) for chunk in self.chunks.values())
+
+    def get_tile(self, x: int, y: int) -> int:
+        """
+        Returns the tile ID at a position.
+
+        Args:
+            x (int): The x-coordinate of the tile.
+            y (int): The y-coordinate of the tile.
+
+        Returns:
+            int: The tile ID, EMPTY if there is no ground.
+        """
+        chunk = self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        if chunk is None:
+            return EMPTY
+        return chunk[(y % CHUNK_SIZE) * CHUNK_SIZE + x % CHUNK_SIZE]
+
+    def set_tile(self, x: int, y: int, tile_id: int) -> None:
+        """
+        Sets the tile ID at a position. The chunk containing the tile is baked again the next time it is rendered.
+
+        Args:
+            x (int): The x-coordinate of the tile.
+            y (int): The y-coordinate of the tile.
+            tile_id (int): The new tile ID.
+        """
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if tile_id == EMPTY:
+                return
+            chunk = array('B', bytes(CHUNK_SIZE * CHUNK_SIZE))
+            self.chunks[key] = chunk
+        chunk[(y % CHUNK_SIZE) * CHUNK_SIZE + x % CHUNK_SIZE] = tile_id
+        self.unbake(key)
+        self.dirty_tiles.add((x, y))
+        self.version += 1
+
+    def fill(self, left: int, bottom: int, right: int, top: int, tile_id: int) -> None:
+        """
+        Sets the tile ID of all tiles in an area.
+
+        Args:
+            left, bottom (int): The lower left tile of the area.
+            right, top (int): The upper right corner of the area (exclusive).
+            tile_id (int): The new tile ID.
+        """
+        for y in range(bottom, top):
+            for x in range(left, right):
+                self.set_tile(x, y, tile_id)
+
+    def tiles(self):
+        """
+        Iterates over all non-empty tiles.
+
+        Yields:
+            tuple: The position and ID of a tile as (x, y, tile_id).
+        """
+        for (chunkX, chunkY), chunk in self.chunks.items():
+            for i, tile_id in enumerate(chunk):
+                if tile_id != EMPTY:
+                    yield (chunkX * CHUNK_SIZE + i % CHUNK_SIZE, chunkY * CHUNK_SIZE + i // CHUNK_SIZE, tile_id)
+
+    def clear(self) -> None:
+        """
+        Removes all tiles.
+        """
+        self.chunks = {}
+        self.baked = OrderedDict()
+        self.baked_pixels = 0
+        self.dirty_tiles = set()
+        self.version += 1
+
+    def bake(self, key: tuple) -> pg.Surface:
+        """
+        Draws all tiles of a chunk onto a single surface at the current tile size.
+
+        Args:
+            key (tuple): The coordinates of the chunk.
+
+        Returns:
+            Surface: The baked chunk. Empty tiles are transparent.
+        """
+        ts = self.world.tile_size
+        chunk = self.chunks[key]
+        surface = pg.Surface((CHUNK_SIZE * ts, CHUNK_SIZE * ts), pg.SRCALPHA)
+        for i, tile_id in enumerate(chunk):
+            if tile_id != EMPTY:
+                image = assets.scale(assets.load(TILE_IMAGES[tile_id]), (ts, ts))
+                # the top row of the surface holds the tiles with the highest y-coordinate
+                surface.blit(image, ((i % CHUNK_SIZE) * ts, (CHUNK_SIZE - 1 - i // CHUNK_SIZE) * ts))
+        return surface
+
+    def unbake(self, key: tuple) -> None:
+        """
+        Drops the baked surface of a chunk, if there is one.
+        """
+        surface = self.baked.pop(key, None)
+        if surface is not None:
+            self.baked_pixels -= surface.get_width() * surface.get_height()
+
+    def render(self) -> None:
+        """
+        Renders the chunks that overlap the visible area, baking them if necessary.
+        The least recently drawn baked chunks are dropped once the baked surfaces exceed the pixel budget.
+        """
+        ts = self.world.tile_size
+        if ts != self.baked_tile_size:
+            # baked surfaces are only valid for the tile size they were made for
+            self.baked = OrderedDict()
+            self.baked_pixels = 0
+            self.baked_tile_size = ts
+        left, bottom, right, top = self.world.get_visible_area()
+        if ts > MAX_BAKED_TILE_SIZE:
+            self.render_tiles(left, bottom, right, top)
+            return
+        blits = 0
+        baked = 0
+        # a tile covers the area from its y-coordinate downwards, so the topmost visible row is ceil(top)
+        for chunkY in range(int(bottom // CHUNK_SIZE), math.ceil(top) // CHUNK_SIZE + 1):
+            for chunkX in range(int(left // CHUNK_SIZE), int(right // CHUNK_SIZE) + 1):
+                key = (chunkX, chunkY)
+                if key not in self.chunks:
+                    continue
+                surface = self.baked.get(key)
+                if surface is None:
+                    surface = self.bake(key)
+                    self.baked[key] = surface
+                    self.baked_pixels += surface.get_width() * surface.get_height()
+                    baked += 1
+                    # the chunk just baked is the most recent one and is never dropped
+                    while self.baked_pixels > self.max_baked_pixels and len(self.baked) > 1:
+                        self.unbake(next(iter(self.baked)))
+                else:
+                    self.baked.move_to_end(key)
+                # the top left tile of the chunk is in its first column and last row
+                self.world.surface.blit(surface, self.world.camera.world_to_screen(chunkX * CHUNK_SIZE, chunkY * CHUNK_SIZE + CHUNK_SIZE - 1))
+                blits += 1
+        self.render_stats = {"blits": blits, "baked": baked}
+
+    def render_tiles(self, left: float, bottom: float, right: float, top: float) -> None:
+        """
+        Renders the visible tiles one by one, without baking their chunks. Used when the camera is zoomed in so far
+        that a baked chunk would be larger than the screen.
+
+        Args:
+            left, bottom, right, top (float): The visible area in world coordinates.
+        """
+        ts = self.world.tile_size
+        surface = self.world.surface
+        camera = self.world.camera
+        blits = 0
+        for y in range(math.floor(bottom), math.ceil(top) + 1):
+            for x in range(math.floor(left), math.floor(right) + 1):
+                tile_id = self.get_tile(x, y)
+                if tile_id != EMPTY:
+                    surface.blit(assets.scale(assets.load(TILE_IMAGES[tile_id]), (ts, ts)), camera.world_to_screen(x, y))
+                    blits += 1
+        self.render_stats = {"blits": blits, "baked": 0}
@@ -0,0 +1,56 @@
+import os
+import pygame as pg
+from world import World
+
+def init_headless(width: int = 1920, height: int = 1080) -> tuple:
+    """
+    Initializes pygame without opening a window, using SDL's dummy video driver.
+
+    Args:
+        width (int): The width of the off-screen surface.
+        height (int): The height of the off-screen surface.
+
+    Returns:
+        tuple: The surface to render on and the font, as (surface, font).
+    """
+    # the video driver is picked when the display is initialized, so this has to happen before pg.init()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pg.init()
+    surface = pg.display.set_mode((width, height))
+    font = pg.font.SysFont("Comic Sans MS", 25)
+    return surface, font
+
+def create_world(name: str = "Headless", width: int = 1920, height: int = 1080) -> World:
+    """
+    Creates a world with its UI on an off-screen surface.
+
+    Args:
+        name (str): The name of the world.
+        width (int): The width of the off-screen surface.
+        height (int): The height of the off-screen surface.
+
+    Returns:
+        World: The new world.
+    """
+    surface, font = init_headless(width, height)
+    world = World(name, surface, pg.time, font)
+    world.init_ui()
+    return world
+
+def run(world: World, ticks: int, render: bool = True) -> None:
+    """
+    Runs the game loop for a number of simulation steps as fast as possible, without pg.display.flip().
+    The simulation is not tied to the wall clock, so this runs faster than real time.
+
+    Args:
+        world (World): The world to run.
+        ticks (int): The number of simulation steps to run.
+        render (bool): Whether to render the world after every step.
+    """
+    world.alpha = 1.0 # render the positions of the latest step
+    for _ in range(ticks):
+        world.events.pump() # keep SDL's event queue from filling up
+        world.step()
+        world.autosave.tick()
+        if render:
+            world.render()
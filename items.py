@@ -0,0 +1,80 @@
+from typing import NamedTuple
+from assets import assets
+
+class Item_Type(NamedTuple):
+    """
+    An immutable description of a kind of item. Inventories and save files refer to items by their type,
+    so an inventory slot is just a reference to a shared Item_Type and a quantity.
+
+    Attributes:
+        name (str): The unique name of the item, used in save files.
+        max_stack_size (int): The maximum number of items in one inventory slot.
+        icon (str): The file name of the icon image, relative to the asset folder.
+    """
+    name: str
+    max_stack_size: int
+    icon: str
+
+    @property
+    def image(self):
+        """
+        The shared icon surface of the item type.
+        """
+        return assets.load(self.icon)
+
+# All item types, keyed by name
+ITEM_TYPES = {}
+
+def register_item_type(name: str, max_stack_size: int, icon: str) -> Item_Type:
+    """
+    Creates an item type and adds it to the registry.
+
+    Args:
+        name (str): The unique name of the item.
+        max_stack_size (int): The maximum number of items in one inventory slot.
+        icon (str): The file name of the icon image.
+
+    Raises:
+        ValueError: If an item type with that name already exists.
+
+    Returns:
+        Item_Type: The new item type.
+    """
+    if name in ITEM_TYPES:
+        raise ValueError(f"Item type already registered: {name}")
+    item_type = Item_Type(name, max_stack_size, icon)
+    ITEM_TYPES[name] = item_type
+    return item_type
+
+IRON_ORE = register_item_type("iron_ore", 64, "iron_ore.png")
+COPPER_ORE = register_item_type("copper_ore", 64, "copper_ore.png")
+COAL = register_item_type("coal", 64, "coal.png")
+WOOD = register_item_type("wood", 64, "wood.png")
+OVEN = register_item_type("oven", 64, "oven.png")
+
+# Older saves stored the class name of the entity an item was mined from
+LEGACY_ITEM_NAMES = {"Iron_Ore": IRON_ORE,
+                     "IronOre": IRON_ORE,
+                     "Copper_Ore": COPPER_ORE,
+                     "CopperOre": COPPER_ORE,
+                     "Coal": COAL,
+                     "Tree": WOOD,
+                     "Oven": OVEN}
+
+def get_item_type(name: str) -> Item_Type:
+    """
+    Returns the item type with a name. Legacy class names from older save files are accepted as well.
+
+    Args:
+        name (str): The name of the item type.
+
+    Raises:
+        ValueError: If there is no item type with that name.
+
+    Returns:
+        Item_Type: The item type.
+    """
+    item_type = ITEM_TYPES.get(name) or LEGACY_ITEM_NAMES.get(name)
+    if item_type is None:
+        raise ValueError(f"Item type not found: {name}")
+    return item_type
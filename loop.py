@@ -0,0 +1,116 @@
+import threading
+from array import array
+from time import perf_counter, sleep
+from typing import NamedTuple
+
+class Fixed_Step_Clock():
+    """
+    Decouples the simulation from the frame rate.
+    The real time that passes between frames is accumulated and paid out in fixed simulation steps,
+    so the game runs at the same speed no matter how fast frames are rendered.
+
+    Attributes:
+        step (float): The length of a simulation step in seconds.
+        max_steps (int): The maximum number of steps per frame. Time beyond that is dropped, so a long stall does not make the simulation spiral.
+        accumulator (float): The real time that has not been simulated yet, in seconds.
+        last_time (float): The time of the last call to advance(), as returned by perf_counter().
+
+    Methods:
+        advance(): Returns the number of steps to simulate this frame.
+        alpha: The fraction of a step that is left over, used to interpolate render positions.
+    """
+
+    def __init__(self, tick_rate: int = 60, max_steps: int = 5) -> None:
+        self.step = 1 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.last_time = perf_counter()
+
+    def advance(self) -> int:
+        """
+        Adds the real time since the last call to the accumulator and takes as many whole steps out of it as possible.
+
+        Returns:
+            int: The number of simulation steps to run this frame.
+        """
+        now = perf_counter()
+        self.accumulator += now - self.last_time
+        self.last_time = now
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            # too far behind to catch up, drop the backlog
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """
+        The fraction of a step that is left in the accumulator, between 0 and 1.
+        """
+        return min(self.accumulator / self.step, 1.0)
+
+class Render_Snapshot(NamedTuple):
+    """
+    An immutable picture of the visible part of the world after a simulation step.
+    The simulation thread publishes a new snapshot after every step and never changes it afterwards,
+    so the render thread can draw it without holding the world lock.
+
+    Attributes:
+        ticks (int): The simulation step the snapshot was taken after.
+        time (float): When the snapshot was published, as returned by perf_counter(). Used to interpolate between steps.
+        ids (array): The IDs of the visible entities, in drawing order.
+        codes (array): The node store type code of each visible entity, or -1 for entities that are objects.
+        positions (array): The positions of the visible entities, four floats per entity: x, y and the x and y before the step.
+        player (tuple): The position of the player as x, y and the x and y before the step, or None if there is no player.
+        messages (tuple): The messages to draw, as (entity ID, tuple of contents) tuples.
+        culled (int): The number of entities outside the visible area.
+    """
+    ticks: int
+    time: float
+    ids: array
+    codes: array
+    positions: array
+    player: tuple
+    messages: tuple
+    culled: int
+
+class Sim_Thread(threading.Thread):
+    """
+    Runs the simulation of a world on its own thread, so a slow frame does not hold up the game logic.
+    The thread owns the fixed step clock. It holds the world lock while it steps and publishes a Render_Snapshot
+    as world.snapshot after every frame's worth of steps. Pygame's event queue and display stay on the main thread.
+
+    Attributes:
+        world (World): The world that is simulated.
+        clock (Fixed_Step_Clock): Decides how many steps to run.
+        running (bool): Cleared by stop() to end the thread.
+
+    Methods:
+        run(): The simulation loop.
+        stop(): Ends the simulation loop and waits for the thread.
+    """
+
+    def __init__(self, world, tick_rate: int = 60, max_steps: int = 5) -> None:
+        super().__init__(name="simulation", daemon=True)
+        self.world = world
+        self.clock = Fixed_Step_Clock(tick_rate, max_steps)
+        self.running = True
+
+    def run(self) -> None:
+        while self.running:
+            steps = self.clock.advance()
+            if steps:
+                with self.world.lock:
+                    for _ in range(steps):
+                        self.world.step()
+                    self.world.autosave.tick()
+                    self.world.snapshot = self.world.build_snapshot()
+            # sleep until the next step is due, the render thread gets the GIL in the meantime
+            sleep(max(self.clock.step - self.clock.accumulator, 0))
+
+    def stop(self) -> None:
+        self.running = False
+        self.join()
@@ -1,10 +1,20 @@
 import pygame as pg
+import random
 from world import World
+from ground import SAND
+from loop import Fixed_Step_Clock, Sim_Thread
+from worldgen import World_Generator
 from entities import *
 from ui import *
 
 # Constants
-TICKRATE = 60
+TICKRATE = 60 # simulation steps per second
+FRAMERATE = 60 # maximum frames per second
+MAX_CATCH_UP = 5 # maximum simulation steps per frame
+AUTOSAVE_INTERVAL = 60 # seconds
+THREADED = False # run the simulation on its own thread and render from snapshots
+DIRTY_RECTS = False # only redraw and update the parts of the window that changed
+SEED = None # the seed of the procedural world, None for a random one
 
 # Initialize Pygame
 pg.init()
@@ -21,12 +31,17 @@ pg.display.set_caption("Factory Game")
 # Set up the clock
 time = pg.time
 clock = time.Clock()
+sim_clock = Fixed_Step_Clock(TICKRATE, MAX_CATCH_UP)
 
 # Set up world
-world = World("Nauvis", window, time, font)
+world = World("Nauvis", window, time, font, TICKRATE)
+world.autosave.interval = AUTOSAVE_INTERVAL
 
-# tiles = [Tile(x, y) for x in range(-10,10) for y in range(-10, 10)]
-# world.add_entities(tiles)
+# Ore patches and forests are generated around the player as the world is explored
+if World_Generator.available():
+    world.chunks.generator = World_Generator(SEED if SEED is not None else random.randrange(1 << 31))
+
+# world.ground.fill(-10, -10, 10, 10, SAND)
 
 # copper_ores = [CopperOre(0, 2, 150), CopperOre(1, 2, 300), CopperOre(1, 3, 250)]
 # iron_ores = [IronOre(5, -3, 200), IronOre(-3, 3, 200), IronOre(-3, 2, 200)]
@@ -45,37 +60,47 @@ world = World("Nauvis", window, time, font)
 # Set up UI
 world.init_ui()
 
+# Start the simulation thread. Events and the display stay on this thread, pygame requires that
+sim_thread = None
+if THREADED:
+    sim_thread = Sim_Thread(world, TICKRATE, MAX_CATCH_UP)
+    sim_thread.start()
+
 # Game loop
 running = True
 paused = False
 while running:
-    window.fill((100,100,100))
-    # Handle events
+    if not DIRTY_RECTS:
+        window.fill(world.background_color)
+    # Handle events. This is the only place that reads the event queue; the world and the UI get the events through the event bus
     for event in pg.event.get():
         if event.type == pg.QUIT:
             running = False
-        if event.type == pg.MOUSEBUTTONDOWN:
-            mouse_status = pg.mouse.get_pressed()
-            pos = pg.mouse.get_pos()
-            # get list of sprites that are under the mouse cursor
-            try:
-                clicked_sprites = [s for s in world.entities if s.rect.collidepoint(pos)]
-            except AttributeError:
-                clicked_sprites = []
-            world.cursor(clicked_sprites, mouse_status)
-        if event.type == pg.KEYDOWN and event.key == pg.K_F1:
-            world.ui_grid.toggle()
-        if event.type == pg.KEYDOWN and event.key == pg.K_F2:
-            world.ui_inventory_bar.toggle()
-        # open menu if esc is pressed
-        if event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
-            world.ui_menu.toggle()
-    if world.player:
-        world.player.move()
+        with world.lock:
+            world.events.dispatch(event)
+    if sim_thread:
+        # draw the latest snapshot of the simulation thread
+        clock.tick(FRAMERATE)
+        if world.snapshot:
+            world.render_snapshot(world.snapshot)
+        pg.display.flip()
+        continue
+    # Run as many fixed simulation steps as real time has passed, then render in between the last two
+    for _ in range(sim_clock.advance()):
+        world.step()
+    world.alpha = sim_clock.alpha
+    # write changes to the save file in the background
+    world.autosave.tick()
     # Update the display
-    clock.tick(TICKRATE)
-    world.render()
-    pg.display.flip()
+    clock.tick(FRAMERATE)
+    if DIRTY_RECTS:
+        pg.display.update(world.render_dirty())
+    else:
+        world.render()
+        pg.display.flip()
+
+if sim_thread:
+    sim_thread.stop()
 
 # Done! Time to quit.
 pg.quit()
@@ -0,0 +1,89 @@
+import heapq
+from itertools import count
+
+class Timer():
+    """
+    A callback that is scheduled to run at a certain time.
+
+    Attributes:
+        time (int): The game time in milliseconds when the callback is due.
+        callback (callable): The function to call.
+        args (tuple): The arguments for the callback.
+        cancelled (bool): Whether the timer was cancelled.
+    """
+
+    __slots__ = ("time", "callback", "args", "cancelled")
+
+    def __init__(self, time: int, callback, args: tuple) -> None:
+        self.time = time
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """
+        Cancels the timer. It stays in the queue until it is due, but the callback is not called.
+        """
+        self.cancelled = True
+
+class Scheduler():
+    """
+    Runs callbacks at given game times, e.g. to expire messages.
+    The timers are kept in a heap ordered by due time, so each call to run() only looks at the timers that are due
+    and entities without pending timers cost nothing per tick.
+
+    Attributes:
+        queue (list): The heap of (time, order, timer) tuples. The order keeps timers that are due at the same time in scheduling order.
+
+    Methods:
+        schedule(time, callback, *args): Schedules a callback.
+        run(now): Calls the callbacks that are due.
+        clear(): Drops all timers.
+    """
+
+    def __init__(self) -> None:
+        self.queue = []
+        self.order = count()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def schedule(self, time: int, callback, *args) -> Timer:
+        """
+        Schedules a callback.
+
+        Args:
+            time (int): The game time in milliseconds when the callback is due.
+            callback (callable): The function to call.
+            *args: The arguments for the callback.
+
+        Returns:
+            Timer: The timer, which can be cancelled.
+        """
+        timer = Timer(time, callback, args)
+        heapq.heappush(self.queue, (time, next(self.order), timer))
+        return timer
+
+    def run(self, now: int) -> int:
+        """
+        Calls the callbacks that are due, in order of their due time. Callbacks may schedule new timers.
+
+        Args:
+            now (int): The current game time in milliseconds.
+
+        Returns:
+            int: The number of callbacks that were called.
+        """
+        called = 0
+        while self.queue and self.queue[0][0] <= now:
+            timer = heapq.heappop(self.queue)[2]
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+                called += 1
+        return called
+
+    def clear(self) -> None:
+        """
+        Drops all timers.
+        """
+        self.queue = []
@@ -0,0 +1,240 @@
+"""
+A compact binary snapshot of a world, for quick-saving and quick-loading.
+
+Usage:
+    python snapshot.py to-snap save/world.db save/world.snap
+    python snapshot.py to-db save/world.snap save/world.db
+
+The file starts with a versioned header, followed by sections that are aligned to 8 bytes:
+the entity type names, the entities as fixed-width columns (ID, type code, x, y, quantity), the ground chunks as they are
+kept in memory, the generated chunks of procedural worlds and the player inventory.
+Loading maps the file into memory and hands the columns to the node store as NumPy views, so no row is parsed in Python;
+only the few entities that are objects (the player, ovens) are created one by one.
+"""
+import argparse
+import mmap
+import os
+import struct
+from array import array
+from time import perf_counter
+try:
+    import numpy as np
+except ImportError: # snapshots are written and read with NumPy, like the node store
+    np = None
+from entities import *
+from ground import CHUNK_SIZE
+from worldgen import World_Generator
+
+MAGIC = b"FGSNAP"
+VERSION = 1
+
+# magic, version, entities, ground chunks, generated chunks, inventory slots, type names, next ID, player ID (-1 for none), seed, has seed
+HEADER = struct.Struct("<6sHqqqqqqqq?")
+
+# The default quick-save file, next to the save files of the save menu
+QUICKSAVE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "save", "quicksave.snap")
+
+def available() -> bool:
+    """
+    Returns whether NumPy is installed and snapshots can be used.
+    """
+    return np is not None
+
+def align(offset: int) -> int:
+    """
+    Returns the next offset that is a multiple of 8, where the next section starts.
+    """
+    return (offset + 7) & ~7
+
+def pack_strings(strings) -> bytes:
+    """
+    Encodes strings as a length in two bytes followed by UTF-8.
+    """
+    return b"".join(struct.pack("<H", len(encoded)) + encoded for encoded in (string.encode() for string in strings))
+
+def unpack_strings(buffer, offset: int, count: int) -> tuple:
+    """
+    Decodes strings written by pack_strings().
+
+    Returns:
+        tuple: The strings and the offset after them.
+    """
+    strings = []
+    for _ in range(count):
+        length, = struct.unpack_from("<H", buffer, offset)
+        offset += 2
+        strings.append(bytes(buffer[offset:offset + length]).decode())
+        offset += length
+    return strings, offset
+
+def save_snapshot(world, file_path: str) -> None:
+    """
+    Writes the whole world to a snapshot file.
+    Rows that are still being streamed from the save file are added first. The ore nodes and trees of evicted chunks are read
+    back from the save file, so the snapshot holds the whole world.
+
+    Args:
+        world (World): The world to save.
+        file_path (str): The path of the snapshot file.
+    """
+    world.chunks.finish_stream()
+    start = perf_counter()
+    names = list(dict.fromkeys(cls.__name__ for cls in ENTITY_TYPES.values() if cls is not Tile))
+    codes = {name: code for code, name in enumerate(names)}
+
+    # the objects, then the node store, then the evicted chunks
+    objects = list(world.entities.values())
+    columns = [(np.array([entity.id for entity in objects], np.int64),
+                np.array([codes[entity.__class__.__name__] for entity in objects], np.uint8),
+                np.array([entity.posX for entity in objects], np.float64),
+                np.array([entity.posY for entity in objects], np.float64),
+                np.array([getattr(entity, "quantity", -1) for entity in objects], np.int32))]
+    nodes = world.nodes
+    if nodes is not None:
+        rows = np.flatnonzero(nodes.alive[:nodes.count])
+        store_codes = np.array([codes[name] for name in nodes.type_names], np.uint8)
+        columns.append((nodes.ids[rows], store_codes[nodes.type_codes[rows]], nodes.posX[rows], nodes.posY[rows], nodes.quantity[rows]))
+    evicted = world.chunks.evicted_rows()
+    if evicted:
+        ids, types, xs, ys, quantities = zip(*evicted)
+        columns.append((np.array(ids, np.int64), np.array([codes[name] for name in types], np.uint8),
+                        np.array(xs, np.float64), np.array(ys, np.float64), np.array(quantities, np.int32)))
+    ids, type_codes, xs, ys, quantities = (np.concatenate(column) for column in zip(*columns))
+
+    ground_keys = list(world.ground.chunks)
+    generated = sorted(world.chunks.generated)
+    inventory = world.player.inventory.items() if world.player is not None else []
+    generator = world.chunks.generator
+    header = HEADER.pack(MAGIC, VERSION, len(ids), len(ground_keys), len(generated), len(inventory), len(names), world.next_id,
+                         world.player.id if world.player is not None else -1, generator.seed if generator is not None else 0, generator is not None)
+
+    folder = os.path.dirname(file_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(file_path, "wb") as file:
+        def write_section(data: bytes) -> None:
+            file.write(data)
+            file.write(bytes(align(file.tell()) - file.tell()))
+        write_section(header)
+        write_section(pack_strings(names))
+        for column in (ids, type_codes, xs, ys, quantities):
+            write_section(column.tobytes())
+        write_section(np.array(ground_keys, np.int32).tobytes())
+        write_section(b"".join(world.ground.chunks[key].tobytes() for key in ground_keys))
+        write_section(np.array(generated, np.int32).tobytes())
+        write_section(np.array([item[1] for item in inventory], np.int32).tobytes())
+        write_section(pack_strings(item[0].name for item in inventory))
+    print(f"Snapshot saved successfully. {len(ids)} entities in {perf_counter() - start:.3f}s")
+
+def load_snapshot(world, file_path: str) -> None:
+    """
+    Replaces the world with the contents of a snapshot file.
+    The world is not tied to a save file afterwards; save_game() writes it to a new one.
+
+    Args:
+        world (World): The world to load into.
+        file_path (str): The path of the snapshot file.
+
+    Raises:
+        ValueError: If the file is not a snapshot, has an unknown version or contains an unknown entity type.
+    """
+    start = perf_counter()
+    with open(file_path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            count = read_snapshot(world, buffer)
+    print(f"Snapshot loaded successfully. {count} entities in {perf_counter() - start:.3f}s")
+
+def read_snapshot(world, buffer) -> int:
+    """
+    Builds the world from the sections of a snapshot in a buffer. The NumPy views into the buffer don't outlive this function.
+
+    Returns:
+        int: The number of entities.
+    """
+    magic, version, count, ground_count, generated_count, inventory_count, name_count, next_id, player_id, seed, has_seed = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a snapshot file")
+    if version != VERSION:
+        raise ValueError(f"Snapshot version not supported: {version}")
+    offset = align(HEADER.size)
+    names, offset = unpack_strings(buffer, offset, name_count)
+    offset = align(offset)
+    for name in names:
+        if name not in ENTITY_TYPES:
+            raise ValueError(f"Entity type not found: {name}")
+
+    def read_column(dtype, length: int):
+        nonlocal offset
+        column = np.frombuffer(buffer, dtype, length, offset)
+        offset = align(offset + column.nbytes)
+        return column
+    ids = read_column(np.int64, count)
+    type_codes = read_column(np.uint8, count)
+    xs = read_column(np.float64, count)
+    ys = read_column(np.float64, count)
+    quantities = read_column(np.int32, count)
+    ground_keys = read_column(np.int32, ground_count * 2).reshape(-1, 2).tolist()
+    ground_offset = offset
+    offset = align(offset + ground_count * CHUNK_SIZE * CHUNK_SIZE)
+    generated = read_column(np.int32, generated_count * 2).reshape(-1, 2).tolist()
+    inventory_quantities = read_column(np.int32, inventory_count).tolist()
+    inventory_names, offset = unpack_strings(buffer, offset, inventory_count)
+
+    world.autosave.flush()
+    world.clear_entities()
+    world.ground.clear()
+    # the rows of the node store are copied over column by column; -1 marks the types that are objects
+    nodes = world.nodes
+    store_codes = np.array([nodes.codes.get(ENTITY_TYPES[name], -1) if nodes is not None else -1 for name in names], np.int16)
+    in_store = store_codes[type_codes] >= 0
+    if in_store.any():
+        nodes.extend(ids[in_store], store_codes[type_codes[in_store]], xs[in_store], ys[in_store], quantities[in_store], changed=False)
+    objects = []
+    for row in np.flatnonzero(~in_store).tolist():
+        entity = ENTITY_TYPES[names[type_codes[row]]].from_save(float(xs[row]), float(ys[row]), int(quantities[row]))
+        entity.id = int(ids[row])
+        objects.append(entity)
+    world.add_entities(objects)
+    # the ground chunks are kept in memory in the same layout
+    size = CHUNK_SIZE * CHUNK_SIZE
+    for i, (chunkX, chunkY) in enumerate(ground_keys):
+        world.ground.chunks[(chunkX, chunkY)] = array("B", buffer[ground_offset + i * size:ground_offset + (i + 1) * size])
+    world.ground.version += 1
+
+    world.next_id = max(world.next_id, next_id)
+    world.chunks.generator = World_Generator(seed) if has_seed and World_Generator.available() else None
+    world.chunks.generated = {tuple(key) for key in generated}
+    world.chunks.loaded = set(world.chunks.generated)
+    if world.player is not None:
+        inventory = Inventory(8)
+        for name, quantity in zip(inventory_names, inventory_quantities):
+            inventory.add_item(get_item_type(name), quantity)
+        world.player.inventory = inventory
+    world.clear_changes()
+    # the snapshot is not a save file, so there is nothing to write changes to until the world is saved again
+    world.world_saved = False
+    world.current_save_fp = None
+    world.remove_scratch()
+    return count
+
+def main() -> None:
+    """
+    Converts save files between the SQLite and the snapshot format.
+    """
+    import headless
+    parser = argparse.ArgumentParser(description="Converts save files between the SQLite (.db) and the snapshot (.snap) format.")
+    parser.add_argument("command", choices=("to-snap", "to-db"), help="to-snap converts a .db file into a snapshot, to-db the other way round")
+    parser.add_argument("source", help="the file to convert")
+    parser.add_argument("target", help="the file to write")
+    args = parser.parse_args()
+    world = headless.create_world("Convert")
+    if args.command == "to-snap":
+        world.load_game(args.source)
+        save_snapshot(world, args.target)
+    else:
+        load_snapshot(world, args.source)
+        world.save_game(args.target)
+    world.close_db()
+
+if __name__ == "__main__":
+    main()
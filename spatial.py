@@ -0,0 +1,120 @@
+import math
+
+class Spatial_Hash():
+    """
+    A spatial index that buckets entities by the grid cells their footprint covers.
+    Lookups only visit the cells around the queried area, so they cost O(local density) instead of O(world size).
+
+    Attributes:
+        cell_size (int): The width and height of a cell in tiles.
+        cells (dict): The entities in each cell, keyed by cell coordinates.
+        entity_cells (dict): The cell coordinates covered by each entity.
+
+    Methods:
+        insert(entity): Adds an entity to the index.
+        remove(entity): Removes an entity from the index.
+        update(entity): Moves an entity to the cells of its current position.
+        query(left, bottom, right, top): Returns the entities in the cells overlapping an area.
+    """
+
+    def __init__(self, cell_size: int = 8) -> None:
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entity_cells = {}
+
+    def __len__(self) -> int:
+        return len(self.entity_cells)
+
+    def get_cells(self, left: float, bottom: float, right: float, top: float) -> list:
+        """
+        Returns the coordinates of the cells overlapping an area.
+
+        Args:
+            left, bottom, right, top (float): The area in world coordinates.
+
+        Returns:
+            list: The cell coordinates as (x, y) tuples.
+        """
+        cs = self.cell_size
+        min_x = math.floor(left / cs)
+        max_x = math.floor(right / cs)
+        min_y = math.floor(bottom / cs)
+        max_y = math.floor(top / cs)
+        return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+    def get_entity_cells(self, entity: object) -> tuple:
+        """
+        Returns the coordinates of the cells covered by an entity.
+        Entities are drawn from their position to the right and downwards, so that is the area they cover.
+        """
+        width, height = entity.get_render_size()
+        return tuple(self.get_cells(entity.posX, entity.posY - height, entity.posX + width, entity.posY))
+
+    def insert(self, entity: object) -> None:
+        """
+        Adds an entity to the index.
+
+        Args:
+            entity (Entity): The entity to add.
+        """
+        cells = self.get_entity_cells(entity)
+        self.entity_cells[entity] = cells
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                self.cells[cell] = {entity}
+            else:
+                bucket.add(entity)
+
+    def remove(self, entity: object) -> None:
+        """
+        Removes an entity from the index.
+
+        Args:
+            entity (Entity): The entity to remove.
+
+        Raises:
+            KeyError: If the entity is not in the index.
+        """
+        for cell in self.entity_cells.pop(entity):
+            bucket = self.cells[cell]
+            bucket.discard(entity)
+            if not bucket:
+                del self.cells[cell]
+
+    def update(self, entity: object) -> None:
+        """
+        Moves an entity to the cells of its current position.
+        This is cheap if the entity stayed within the same cells.
+
+        Args:
+            entity (Entity): The entity that moved.
+        """
+        if self.get_entity_cells(entity) != self.entity_cells.get(entity):
+            self.remove(entity)
+            self.insert(entity)
+
+    def query(self, left: float, bottom: float, right: float, top: float) -> set:
+        """
+        Returns the entities in the cells overlapping an area.
+        The result may contain entities close to, but outside of, the area.
+
+        Args:
+            left, bottom, right, top (float): The area in world coordinates.
+
+        Returns:
+            set: The candidate entities.
+        """
+        result = set()
+        for cell in self.get_cells(left, bottom, right, top):
+            bucket = self.cells.get(cell)
+            if bucket:
+                result.update(bucket)
+        return result
+
+    def clear(self) -> None:
+        """
+        Removes all entities from the index.
+        """
+        self.cells = {}
+        self.entity_cells = {}
@@ -0,0 +1,470 @@
+import math
+import pygame as pg
+try:
+    import numpy as np
+except ImportError: # the store is optional, without NumPy every entity is an object
+    np = None
+
+CELL_SIZE = 8 # the width and height of a cell of the grid index in tiles, like Spatial_Hash
+CELL_OFFSET = 1 << 20 # cell coordinates are shifted by this to make the keys positive
+CELL_SPAN = 1 << 21
+LOD_CHUNK_SIZE = 16 # the width and height of a coloured chunk when zoomed out far, in tiles, like the ground chunks
+LOD_COLORKEY = (255, 0, 255) # the colour of the tiles without a row in a coloured chunk, drawn transparent
+
+class Node_Store():
+    """
+    A columnar store for the numerous entities that hardly ever change, like ore nodes and trees.
+    Each entity is a row in a set of NumPy arrays (ID, type code, position, quantity) instead of an object,
+    so culling, range queries and saving are vectorised over the arrays.
+    Entity objects ("wrappers") are only created on demand, e.g. when a node is clicked or mined, and write their changes back through World.update_entity().
+
+    Rows are kept sorted by ID, so a row is found with a binary search. Removed rows are only marked dead and compacted away in bulk.
+    Area queries go through a grid index: the row numbers sorted by grid cell, so each row of cells is one contiguous slice.
+    The index is rebuilt lazily after rows were added or moved.
+
+    Attributes:
+        world (World): The world the store belongs to.
+        types (list): The entity classes kept in the store. The type code of a row is the index into this list.
+        ids, type_codes, posX, posY, quantity, alive (ndarray): The columns. Only the first `count` rows are used.
+        count (int): The number of used rows, including dead ones.
+        dead (int): The number of removed rows that were not compacted yet.
+        dirty (set): The IDs of rows that changed since the last save.
+        version (int): Incremented whenever rows are added, removed or moved, to tell when cached renderings are outdated.
+        lod_chunks (dict): The coloured chunks drawn when zoomed out far, keyed by chunk position. None for chunks without rows.
+        cell_keys (ndarray): The sorted cell keys of the grid index, or None if it has to be rebuilt.
+        cell_rows (ndarray): The row numbers in the order of cell_keys.
+        wrappers (dict): The entity objects that were created for rows, keyed by ID.
+
+    Methods:
+        available(): Whether NumPy is installed.
+        handles(entity): Whether an entity belongs in the store.
+        extend(ids, codes, xs, ys, quantities): Appends rows.
+        add_entities(entities): Appends a row for each entity.
+        remove(entity_id): Removes a row.
+        remove_rows(rows): Removes many rows at once.
+        update(entity): Writes the position and quantity of a wrapper back to its row.
+        query_rect(left, bottom, right, top): Returns the rows overlapping an area.
+        query_point(x, y): Returns the rows covering a point.
+        nearest(entity_type, pos, radius): Returns the closest row of a type.
+        wrap(row): Returns the entity object of a row.
+        drawable(row): Returns an object that can render a row.
+        render_lod(): Renders the visible rows as coloured chunks.
+        save_rows(ids): Returns save file rows.
+    """
+
+    def __init__(self, world, types, capacity: int = 1024) -> None:
+        self.world = world
+        self.types = list(types)
+        self.codes = {cls: code for code, cls in enumerate(self.types)}
+        self.type_names = [cls.__name__ for cls in self.types]
+        self.prototypes = [None] * len(self.types)
+        self.widths = np.zeros(len(self.types))
+        self.heights = np.zeros(len(self.types))
+        self.ids = np.empty(capacity, np.int64)
+        self.type_codes = np.empty(capacity, np.int8)
+        self.posX = np.empty(capacity, np.float64)
+        self.posY = np.empty(capacity, np.float64)
+        self.quantity = np.empty(capacity, np.int32)
+        self.alive = np.empty(capacity, np.bool_)
+        self.count = 0
+        self.dead = 0
+        self.sorted = True
+        self.dirty = set()
+        self.wrappers = {}
+        self.cell_keys = None
+        self.cell_rows = None
+        self.version = 0
+        self.lod_chunks = {}
+        self.lod_key = None
+
+    @staticmethod
+    def available() -> bool:
+        """
+        Returns whether NumPy is installed and the store can be used.
+        """
+        return np is not None
+
+    def __len__(self) -> int:
+        return self.count - self.dead
+
+    def __contains__(self, entity_id: int) -> bool:
+        return self.find(entity_id) is not None
+
+    def handles(self, entity) -> bool:
+        """
+        Returns whether an entity belongs in the store. Subclasses are not included, they may behave differently.
+        """
+        return type(entity) in self.codes
+
+    def prototype(self, code: int):
+        """
+        Returns a shared entity of a type that is used to draw its rows. It is never part of the world.
+
+        Args:
+            code (int): The type code.
+        """
+        prototype = self.prototypes[code]
+        if prototype is None:
+            prototype = self.types[code].from_save(0, 0, 0)
+            prototype.world = self.world
+            self.prototypes[code] = prototype
+            self.widths[code], self.heights[code] = prototype.get_render_size()
+        return prototype
+
+    def grow(self, size: int) -> None:
+        """
+        Makes room for at least `size` rows. The capacity doubles, so appending one row at a time stays cheap.
+        """
+        capacity = len(self.ids)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("ids", "type_codes", "posX", "posY", "quantity", "alive"):
+            column = getattr(self, name)
+            new_column = np.empty(capacity, column.dtype)
+            new_column[:self.count] = column[:self.count]
+            setattr(self, name, new_column)
+
+    def extend(self, ids, codes, xs, ys, quantities, changed: bool = True) -> None:
+        """
+        Appends rows.
+
+        Args:
+            ids, codes, xs, ys, quantities (sequence): The columns of the new rows.
+            changed (bool): Whether to mark the rows as changed for the next save. Rows that were just read from a save file are not.
+        """
+        n = len(ids)
+        if n == 0:
+            return
+        for code in np.unique(codes).tolist():
+            self.prototype(code) # make sure the footprint of the type is known
+        start = self.count
+        self.grow(start + n)
+        end = start + n
+        self.ids[start:end] = ids
+        self.type_codes[start:end] = codes
+        self.posX[start:end] = xs
+        self.posY[start:end] = ys
+        self.quantity[start:end] = quantities
+        self.alive[start:end] = True
+        if self.sorted and (start > 0 and self.ids[start] <= self.ids[start - 1] or np.any(np.diff(self.ids[start:end]) <= 0)):
+            self.sorted = False
+        self.count = end
+        if changed:
+            self.dirty.update(ids)
+        self.cell_keys = None
+        self.version += 1
+
+    def add_entities(self, entities: list) -> None:
+        """
+        Appends a row for each entity. The entities must have an ID. They are bound as the wrappers of their rows,
+        so the caller can keep using them, e.g. to mine them or to give them messages.
+
+        Args:
+            entities (list): The entities to add.
+        """
+        self.extend([entity.id for entity in entities],
+                    [self.codes[type(entity)] for entity in entities],
+                    [entity.posX for entity in entities],
+                    [entity.posY for entity in entities],
+                    [getattr(entity, "quantity", -1) for entity in entities])
+        for entity in entities:
+            entity.world = self.world
+            self.wrappers[entity.id] = entity
+
+    def sort(self) -> None:
+        """
+        Sorts the rows by ID and drops the dead rows.
+        """
+        order = np.argsort(self.ids[:self.count], kind="stable")
+        order = order[self.alive[:self.count][order]]
+        for name in ("ids", "type_codes", "posX", "posY", "quantity", "alive"):
+            column = getattr(self, name)
+            column[:len(order)] = column[:self.count][order]
+        self.count = len(order)
+        self.dead = 0
+        self.sorted = True
+        self.cell_keys = None # the row numbers changed
+
+    def find(self, entity_id: int):
+        """
+        Returns the row of an ID, or None if there is no live row with that ID.
+        """
+        if not self.sorted:
+            self.sort()
+        row = int(np.searchsorted(self.ids[:self.count], entity_id))
+        if row < self.count and self.ids[row] == entity_id and self.alive[row]:
+            return row
+        return None
+
+    def remove(self, entity_id: int) -> None:
+        """
+        Removes the row of an ID. Removed rows are compacted away once they make up half of the store.
+        """
+        row = self.find(entity_id)
+        if row is None:
+            return
+        self.alive[row] = False
+        self.dead += 1
+        self.version += 1
+        self.dirty.discard(entity_id)
+        wrapper = self.wrappers.pop(entity_id, None)
+        if wrapper is not None:
+            wrapper.world = None
+        if self.dead > self.count // 2:
+            self.sort()
+
+    def remove_rows(self, rows) -> None:
+        """
+        Removes many rows at once, e.g. a chunk that is unloaded. Unlike remove(), the rows are not marked as changed.
+
+        Args:
+            rows (ndarray): The row numbers of live rows.
+        """
+        if len(rows) == 0:
+            return
+        self.alive[rows] = False
+        self.dead += len(rows)
+        self.version += 1
+        for entity_id in self.ids[rows].tolist():
+            self.dirty.discard(entity_id)
+            wrapper = self.wrappers.pop(entity_id, None)
+            if wrapper is not None:
+                wrapper.world = None
+        if self.dead > self.count // 2:
+            self.sort()
+
+    def update(self, entity) -> None:
+        """
+        Writes the position and quantity of a wrapper back to its row and marks the row for the next save.
+        """
+        row = self.find(entity.id)
+        if row is None:
+            return
+        if self.posX[row] != entity.posX or self.posY[row] != entity.posY:
+            self.cell_keys = None
+            self.version += 1
+        self.posX[row] = entity.posX
+        self.posY[row] = entity.posY
+        self.quantity[row] = getattr(entity, "quantity", -1)
+        self.dirty.add(entity.id)
+
+    @staticmethod
+    def cell_key(cellX, cellY):
+        """
+        Returns the key of a grid cell. Keys of cells in the same row are consecutive.
+        """
+        return (cellY + CELL_OFFSET) * CELL_SPAN + cellX + CELL_OFFSET
+
+    def candidates(self, left: float, bottom: float, right: float, top: float):
+        """
+        Returns the rows in the grid cells that entities overlapping an area can be in. The rows still have to be filtered.
+
+        Args:
+            left, bottom, right, top (float): The area in world coordinates.
+
+        Returns:
+            ndarray: The row numbers.
+        """
+        n = self.count
+        if self.cell_keys is None:
+            keys = self.cell_key(np.floor(self.posX[:n] / CELL_SIZE).astype(np.int64), np.floor(self.posY[:n] / CELL_SIZE).astype(np.int64))
+            self.cell_rows = np.argsort(keys, kind="stable")
+            self.cell_keys = keys[self.cell_rows]
+        # entities reach to the right and downwards from their position, so look further left and up by the largest footprint
+        min_x = math.floor((left - self.widths.max()) / CELL_SIZE)
+        max_x = math.floor(right / CELL_SIZE)
+        min_y = math.floor(bottom / CELL_SIZE)
+        max_y = math.floor((top + self.heights.max()) / CELL_SIZE)
+        slices = []
+        for cellY in range(min_y, max_y + 1):
+            start = np.searchsorted(self.cell_keys, self.cell_key(min_x, cellY), "left")
+            end = np.searchsorted(self.cell_keys, self.cell_key(max_x, cellY), "right")
+            if end > start:
+                slices.append(self.cell_rows[start:end])
+        return np.concatenate(slices) if slices else np.empty(0, np.int64)
+
+    def query_rect(self, left: float, bottom: float, right: float, top: float):
+        """
+        Returns the live rows whose footprint overlaps an area.
+
+        Args:
+            left, bottom, right, top (float): The area in world coordinates.
+
+        Returns:
+            ndarray: The row numbers.
+        """
+        rows = self.candidates(left, bottom, right, top)
+        x = self.posX[rows]
+        y = self.posY[rows]
+        codes = self.type_codes[rows]
+        # entities cover the area from their position to the right and downwards
+        mask = (x < right) & (y > bottom) & (x + self.widths[codes] > left) & (y - self.heights[codes] < top) & self.alive[rows]
+        return rows[mask]
+
+    def query_point(self, x: float, y: float):
+        """
+        Returns the live rows whose footprint contains a point.
+
+        Returns:
+            ndarray: The row numbers.
+        """
+        rows = self.candidates(x, y, x, y)
+        posX = self.posX[rows]
+        posY = self.posY[rows]
+        codes = self.type_codes[rows]
+        mask = (posX <= x) & (x < posX + self.widths[codes]) & (posY - self.heights[codes] < y) & (y <= posY) & self.alive[rows]
+        return rows[mask]
+
+    def nearest(self, entity_type, pos: tuple, radius: float):
+        """
+        Returns the closest live row of a type.
+
+        Args:
+            entity_type (type): The class (or tuple of classes) to look for.
+            pos (tuple): The position in world coordinates.
+            radius (float): The maximum distance from the position.
+
+        Returns:
+            tuple: The row and its distance, or None if there is no matching row within the radius.
+        """
+        codes = [code for code, cls in enumerate(self.types) if issubclass(cls, entity_type)]
+        if not codes:
+            return None
+        x, y = pos
+        rows = self.candidates(x - radius, y - radius, x + radius, y + radius)
+        rows = rows[np.isin(self.type_codes[rows], codes) & self.alive[rows]]
+        if len(rows) == 0:
+            return None
+        dist = np.hypot(self.posX[rows] - x, self.posY[rows] - y)
+        closest = int(np.argmin(dist))
+        if dist[closest] > radius:
+            return None
+        return int(rows[closest]), float(dist[closest])
+
+    def wrap(self, row: int):
+        """
+        Returns the entity object of a row, creating it on first use. The same object is returned as long as the row exists.
+        """
+        entity_id = int(self.ids[row])
+        entity = self.wrappers.get(entity_id)
+        if entity is None:
+            code = self.type_codes[row]
+            entity = self.types[code].from_save(float(self.posX[row]), float(self.posY[row]), int(self.quantity[row]))
+            entity.id = entity_id
+            entity.world = self.world
+            self.wrappers[entity_id] = entity
+        return entity
+
+    def get(self, entity_id: int):
+        """
+        Returns the entity object of an ID, or None if there is no row with that ID.
+        """
+        row = self.find(entity_id)
+        return self.wrap(row) if row is not None else None
+
+    def drawable(self, row: int):
+        """
+        Returns the object that renders a row: its wrapper if there is one, since it may have messages, or else the shared prototype of its type.
+        """
+        wrapper = self.wrappers.get(int(self.ids[row]))
+        return wrapper if wrapper is not None else self.prototype(self.type_codes[row])
+
+    def bake_lod(self, chunkX: int, chunkY: int, tile_size: int):
+        """
+        Draws the rows overlapping a chunk with one coloured square per tile they cover.
+
+        Args:
+            chunkX, chunkY (int): The position of the chunk in chunks.
+            tile_size (int): The size of a tile in pixels.
+
+        Returns:
+            Surface: The chunk, or None if no row overlaps it.
+        """
+        left = chunkX * LOD_CHUNK_SIZE
+        bottom = chunkY * LOD_CHUNK_SIZE
+        # tile y covers the world from y - 1 to y, like the ground
+        rows = self.query_rect(left, bottom - 1, left + LOD_CHUNK_SIZE, bottom + LOD_CHUNK_SIZE - 1)
+        if len(rows) == 0:
+            return None
+        # one pixel per tile, indexed [x, y] with y growing downwards like surfarray
+        pixels = np.empty((LOD_CHUNK_SIZE, LOD_CHUNK_SIZE, 3), np.uint8)
+        pixels[:] = LOD_COLORKEY
+        codes = self.type_codes[rows]
+        for code in np.unique(codes).tolist():
+            selected = rows[codes == code]
+            tileX = np.floor(self.posX[selected]).astype(np.int64) - left
+            tileY = np.floor(self.posY[selected]).astype(np.int64) - bottom
+            color = self.types[code].lod_color
+            for dx in range(math.ceil(self.widths[code])):
+                for dy in range(math.ceil(self.heights[code])):
+                    x = tileX + dx
+                    y = LOD_CHUNK_SIZE - 1 - (tileY - dy)
+                    inside = (x >= 0) & (x < LOD_CHUNK_SIZE) & (y >= 0) & (y < LOD_CHUNK_SIZE)
+                    pixels[x[inside], y[inside]] = color
+        surface = pg.surfarray.make_surface(pixels)
+        surface = pg.transform.scale(surface, (LOD_CHUNK_SIZE * tile_size, LOD_CHUNK_SIZE * tile_size))
+        surface.set_colorkey(LOD_COLORKEY)
+        return surface
+
+    def render_lod(self) -> None:
+        """
+        Renders the visible rows as coloured chunks instead of sprites, for when the camera is zoomed out so far
+        that there are too many rows on the screen to draw one by one. The chunks are cached until rows change or the zoom level does.
+        """
+        camera = self.world.camera
+        ts = camera.tile_size
+        if self.lod_key != (self.version, ts):
+            self.lod_chunks = {}
+            self.lod_key = (self.version, ts)
+        left, bottom, right, top = camera.get_visible_area()
+        min_x = math.floor(left / LOD_CHUNK_SIZE)
+        max_x = math.floor(right / LOD_CHUNK_SIZE)
+        min_y = math.floor(bottom / LOD_CHUNK_SIZE)
+        max_y = math.floor(top / LOD_CHUNK_SIZE)
+        visible = (max_x - min_x + 1) * (max_y - min_y + 1)
+        if len(self.lod_chunks) > visible * 4:
+            self.lod_chunks = {} # forget the chunks that were scrolled past
+        for chunkY in range(min_y, max_y + 1):
+            for chunkX in range(min_x, max_x + 1):
+                key = (chunkX, chunkY)
+                if key in self.lod_chunks:
+                    surface = self.lod_chunks[key]
+                else:
+                    surface = self.bake_lod(chunkX, chunkY, ts)
+                    self.lod_chunks[key] = surface
+                if surface is not None:
+                    # the top left tile of the chunk is in its first column and last row
+                    self.world.surface.blit(surface, camera.world_to_screen(chunkX * LOD_CHUNK_SIZE, chunkY * LOD_CHUNK_SIZE + LOD_CHUNK_SIZE - 1))
+
+    def save_rows(self, ids=None) -> list:
+        """
+        Returns rows for the entities table of a save file.
+
+        Args:
+            ids (iterable): The IDs to return rows for. Defaults to all live rows.
+
+        Returns:
+            list: The rows as (id, type, posX, posY, quantity) tuples.
+        """
+        if ids is None:
+            rows = np.flatnonzero(self.alive[:self.count])
+        else:
+            rows = [row for row in map(self.find, ids) if row is not None]
+        names = self.type_names
+        return list(zip(self.ids[rows].tolist(), [names[code] for code in self.type_codes[rows].tolist()], self.posX[rows].tolist(), self.posY[rows].tolist(), self.quantity[rows].tolist()))
+
+    def clear(self) -> None:
+        """
+        Removes all rows.
+        """
+        for entity in self.wrappers.values():
+            entity.world = None
+        self.wrappers = {}
+        self.count = 0
+        self.dead = 0
+        self.sorted = True
+        self.dirty = set()
+        self.cell_keys = None
+        self.version += 1
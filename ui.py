@@ -1,10 +1,51 @@
 import pygame as pg
 from entities import *
+from assets import assets
 import os
 
 class UI_Element():
+    """
+    Base class of the UI elements.
+    Every element draws itself into its own surface, which is only rebuilt when the element is marked dirty.
+    A visible element that did not change costs a single blit per frame.
+
+    Attributes:
+        world (World): The world the element belongs to.
+        visible (bool): Whether the element is shown. Changing it marks the element dirty.
+        dirty (bool): Whether the cached surface has to be rebuilt.
+        surface (Surface): The cached rendering of the element.
+        rect (Rect): The position of the cached surface on the screen.
+
+    Methods:
+        toggle(): Toggles the element on or off.
+        subscribe(events, z): Subscribes the element to the input events it handles.
+        handle_event(event): Handles an input event.
+        update(): Checks for state changes. Called every frame.
+        layout(): Computes the rects of the element in screen coordinates.
+        draw(surface): Draws the element onto its cached surface.
+        prepare(): Rebuilds the cached surface if necessary and returns whether the element is shown.
+        render(): Rebuilds the cached surface if necessary and blits it.
+    """
+
+    # The event types the element handles
+    event_types = ()
+
     def __init__(self, world):
         self.world = world
+        self._visible = False
+        self.dirty = True
+        self.surface = None
+        self.rect = None
+
+    @property
+    def visible(self) -> bool:
+        return self._visible
+
+    @visible.setter
+    def visible(self, visible: bool) -> None:
+        if visible != self._visible:
+            self._visible = visible
+            self.dirty = True
 
     def toggle(self):
         """
@@ -15,153 +56,263 @@ class UI_Element():
         else:
             self.visible = True
 
+    def local(self, rect: pg.Rect) -> pg.Rect:
+        """
+        Converts a rect from screen coordinates to the coordinates of the cached surface.
+        """
+        return rect.move(-self.rect.x, -self.rect.y)
+
+    def subscribe(self, events, z: int):
+        """
+        Subscribes the element to the input events it handles.
+
+        Args:
+            events (Event_Bus): The event bus of the world.
+            z (int): The z-order of the element. Elements drawn on top should have a higher z.
+        """
+        for event_type in self.event_types:
+            events.subscribe(event_type, self.handle_event, z)
+
+    def handle_event(self, event) -> bool:
+        """
+        Handles an input event.
+
+        Args:
+            event (Event): The event.
+
+        Returns:
+            bool: True if the event was consumed.
+        """
+        return False
+
+    def update(self):
+        """
+        Checks for state changes. Called every frame, before rendering.
+        """
+        pass
+
+    def layout(self):
+        """
+        Computes self.rect and the rects used for drawing and hit-testing, in screen coordinates.
+        """
+        raise NotImplementedError
+
+    def draw(self, surface: pg.Surface):
+        """
+        Draws the element onto its cached surface.
+
+        Args:
+            surface (Surface): The cached surface, with the size of self.rect.
+        """
+        raise NotImplementedError
+
+    def prepare(self) -> bool:
+        """
+        Checks for state changes and rebuilds the cached surface if the element is dirty, without drawing it.
+
+        Returns:
+            bool: True if the element is shown.
+        """
+        self.update()
+        if self.visible and self.dirty:
+            self.layout()
+            self.surface = pg.Surface(self.rect.size, pg.SRCALPHA)
+            self.draw(self.surface)
+            self.dirty = False
+        return self.visible
+
+    def render(self):
+        """
+        Renders the UI element. The cached surface is only rebuilt if the element is dirty.
+        """
+        if self.prepare():
+            self.world.surface.blit(self.surface, self.rect)
+
 class Grid(UI_Element):
     def __init__(self, world):
         super().__init__(world)
         self.visible = False
-
-    def render(self):
-        if self.visible:
-            # Render the grid
-            centerPosX = self.world.surface.get_width() // 2
-            centerPosY = self.world.surface.get_height() // 2
-            ts = self.world.tile_size
-
-            for x in range(centerPosX - ts * 15, centerPosX + ts * 15, ts):
-                col = 'red' if x == centerPosX else 'yellow'
-                pg.draw.line(self.world.surface, pg.Color(col), (x, 0), (x, self.world.surface.get_height()))
-            for y in range(centerPosY - ts * 15, centerPosY + ts * 15, ts):
-                col = 'red' if y == centerPosY else 'yellow'
-                pg.draw.line(self.world.surface, pg.Color(col), (0, y), (self.world.surface.get_width(), y))
+        self.view = None # the camera view the grid was drawn for
+
+    def update(self):
+        # the grid lines move with the camera
+        if self.visible and self.view != self.world.camera.get_view():
+            self.view = self.world.camera.get_view()
+            self.dirty = True
+
+    def layout(self):
+        self.rect = self.world.surface.get_rect()
+
+    def draw(self, surface):
+        # Render the grid, the axes of the world in red
+        columns, rows = self.world.camera.get_grid_lines()
+        if len(columns) > self.rect.width // 4:
+            return # too far zoomed out for the lines to be useful
+        for x, screenX in columns:
+            col = 'red' if x == 0 else 'yellow'
+            pg.draw.line(surface, pg.Color(col), (screenX, 0), (screenX, self.rect.height))
+        for y, screenY in rows:
+            col = 'red' if y == 0 else 'yellow'
+            pg.draw.line(surface, pg.Color(col), (0, screenY), (self.rect.width, screenY))
 
 class Inventory_Bar(UI_Element):
+    event_types = (pg.MOUSEBUTTONDOWN,)
+
     def __init__(self, world):
         super().__init__(world)
         self.visible = True
-
-    def render(self):
-        if self.visible and self.world.player is not None:
-            # Render the inventory bar
-            inventory_bar_width = self.world.surface.get_width() // 2
-            inventory_bar_height = self.world.surface.get_height() // 10
-            inventory_slot_width = inventory_bar_width // 8
-
-            # Render the inventory bar background
-            inventory_bar_rect = pg.Rect(inventory_bar_width // 2, self.world.surface.get_height() - inventory_bar_height, inventory_bar_width, inventory_bar_height)
-            pg.draw.rect(self.world.surface, pg.Color('gray'), inventory_bar_rect)
-
-            # Render the inventory slots
-            slot_rects = []
-            for i in range(8):
-                slot_rect = pg.Rect(inventory_bar_width // 2 + i * inventory_slot_width, self.world.surface.get_height() - inventory_bar_height, inventory_slot_width, inventory_bar_height)
-                slot_rects.append(slot_rect)
-                pg.draw.rect(self.world.surface, pg.Color('white'), slot_rect, 2)
-
-            # Render the inventory items
-            i = 0
-            for item in self.world.player.inventory:
-                slot_rect = slot_rects[i]
-                item_img = item[0].icon if item[0].icon else item[0].image
-                item_img = pg.transform.scale(item_img, (inventory_slot_width - 20, inventory_bar_height - 20))
-                self.world.surface.blit(item_img, (slot_rect.x + 10, slot_rect.y + 10))
-                self.world.surface.blit(self.world.font.render(str(item[1]), True, pg.Color('white'), pg.Color('black')), (slot_rect.x + 10, slot_rect.y + 10))
-                i += 1
+        self.shown_inventory = None # the inventory and version drawn on the cached surface
+
+    def update(self):
+        inventory = self.world.player.inventory
+        if (inventory, inventory.version) != self.shown_inventory:
+            self.shown_inventory = (inventory, inventory.version)
+            self.dirty = True
+
+    def handle_event(self, event):
+        # clicks on the bar must not reach the world behind it
+        return self.visible and self.world.player is not None and self.rect is not None and self.rect.collidepoint(event.pos)
+
+    def prepare(self):
+        # there is nothing to show without a player
+        return self.world.player is not None and super().prepare()
+
+    def layout(self):
+        inventory_bar_width = self.world.surface.get_width() // 2
+        inventory_bar_height = self.world.surface.get_height() // 10
+        inventory_slot_width = inventory_bar_width // 8
+        self.rect = pg.Rect(inventory_bar_width // 2, self.world.surface.get_height() - inventory_bar_height, inventory_bar_width, inventory_bar_height)
+        self.slot_rects = [pg.Rect(self.rect.x + i * inventory_slot_width, self.rect.y, inventory_slot_width, inventory_bar_height) for i in range(8)]
+
+    def draw(self, surface):
+        # Render the inventory bar background
+        pg.draw.rect(surface, pg.Color('gray'), self.local(self.rect))
+
+        # Render the inventory slots
+        for slot_rect in self.slot_rects:
+            pg.draw.rect(surface, pg.Color('white'), self.local(slot_rect), 2)
+
+        # Render the inventory items
+        for slot_rect, item in zip(self.slot_rects, self.world.player.inventory):
+            slot_rect = self.local(slot_rect)
+            item_img = assets.scale(item[0].image, (slot_rect.width - 20, slot_rect.height - 20))
+            surface.blit(item_img, (slot_rect.x + 10, slot_rect.y + 10))
+            surface.blit(assets.render_text(self.world.font, str(item[1]), True, pg.Color('white'), pg.Color('black')), (slot_rect.x + 10, slot_rect.y + 10))
 
 class Simple_Menu(UI_Element):
+    event_types = (pg.MOUSEMOTION, pg.MOUSEBUTTONDOWN)
+
     def __init__(self, world):
         super().__init__(world)
         self.visible = True
-
-    def render(self):
-        if self.visible:
-            # Render the menu buttons
-            button_width = 200
-            button_height = 50
-            button_padding = 20
-            button_x = self.world.surface.get_width() // 2 - button_width // 2
-            button_y = self.world.surface.get_height() // 2 - (button_height + button_padding) * 2
-
-            resume_button_rect = pg.Rect(button_x, button_y, button_width, button_height)
-            pg.draw.rect(self.world.surface, pg.Color('green'), resume_button_rect)
-            self.world.surface.blit(self.world.font.render("Resume", True, pg.Color('white')), (resume_button_rect.x + 10, resume_button_rect.y + 10))
-
-            save_button_rect = pg.Rect(button_x, button_y + button_height + button_padding, button_width, button_height)
-            pg.draw.rect(self.world.surface, pg.Color('blue'), save_button_rect)
-            self.world.surface.blit(self.world.font.render("Save", True, pg.Color('white')), (save_button_rect.x + 10, save_button_rect.y + 10))
-
-            load_button_rect = pg.Rect(button_x, button_y + (button_height + button_padding) * 2, button_width, button_height)
-            pg.draw.rect(self.world.surface, pg.Color('orange'), load_button_rect)
-            self.world.surface.blit(self.world.font.render("Load", True, pg.Color('white')), (load_button_rect.x + 10, load_button_rect.y + 10))
-
-            quit_button_rect = pg.Rect(button_x, button_y + (button_height + button_padding) * 3, button_width, button_height)
-            pg.draw.rect(self.world.surface, pg.Color('red'), quit_button_rect)
-            self.world.surface.blit(self.world.font.render("Quit", True, pg.Color('white')), (quit_button_rect.x + 10, quit_button_rect.y + 10))
-
-            # Handle button clicks
-            mouse_pos = pg.mouse.get_pos()
-            if pg.mouse.get_pressed()[0]:
-                if resume_button_rect.collidepoint(mouse_pos):
-                    # Hide menu
-                    self.visible = False
-                elif save_button_rect.collidepoint(mouse_pos):
-                    # Call the save function
-                    self.visible = False
-                    self.world.ui_save_game_selection.visible = True
-                elif load_button_rect.collidepoint(mouse_pos):
-                    # Call the load function
-                    self.visible = False
-                    self.world.ui_load_game_selection.visible = True
-                elif quit_button_rect.collidepoint(mouse_pos):
-                    # Call the quit function
-                    self.visible = False
-                    self.world.quit_game()
+        self.hovered = None # the label of the button under the mouse cursor
+        self.layout()
+
+    def layout(self):
+        # The menu buttons as (label, colour, rect)
+        button_width = 200
+        button_height = 50
+        button_padding = 20
+        button_x = self.world.surface.get_width() // 2 - button_width // 2
+        button_y = self.world.surface.get_height() // 2 - (button_height + button_padding) * 2
+        self.buttons = [(label, color, pg.Rect(button_x, button_y + i * (button_height + button_padding), button_width, button_height))
+                        for i, (label, color) in enumerate([("Resume", 'green'), ("Save", 'blue'), ("Load", 'orange'), ("Quit", 'red')])]
+        self.rect = self.buttons[0][2].unionall([rect for label, color, rect in self.buttons])
+
+    def draw(self, surface):
+        # Render the menu buttons
+        for label, color, rect in self.buttons:
+            rect = self.local(rect)
+            pg.draw.rect(surface, pg.Color(color), rect)
+            if label == self.hovered:
+                pg.draw.rect(surface, pg.Color('white'), rect, 2)
+            surface.blit(assets.render_text(self.world.font, label, True, pg.Color('white')), (rect.x + 10, rect.y + 10))
+
+    def handle_event(self, event):
+        if not self.visible:
+            return False
+        hovered = None
+        for label, color, rect in self.buttons:
+            if rect.collidepoint(event.pos):
+                hovered = label
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.dirty = True
+
+        # Handle button clicks
+        if event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
+            if hovered == "Resume":
+                # Hide menu
+                self.visible = False
+            elif hovered == "Save":
+                # Call the save function
+                self.visible = False
+                self.world.ui_save_game_selection.visible = True
+            elif hovered == "Load":
+                # Call the load function
+                self.visible = False
+                self.world.ui_load_game_selection.visible = True
+            elif hovered == "Quit":
+                # Call the quit function
+                self.visible = False
+                self.world.quit_game()
+        return event.type == pg.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos)
 
 class Load_Game_Selection(UI_Element):
+    event_types = (pg.MOUSEBUTTONDOWN, pg.KEYDOWN)
+
     def __init__(self, world):
         super().__init__(world)
         self.visible = False
         self.savegame_files = self.get_savegame_files()
-
-    def render(self):
-        if self.visible:
-            # Get the list of savegame files
-            print(self.savegame_files)
-            # Render the savegame selection menu
-            menu_width = 400
-            menu_height = 300
-            menu_x = self.world.surface.get_width() // 2 - menu_width // 2
-            menu_y = self.world.surface.get_height() // 2 - menu_height // 2
-
-            menu_rect = pg.Rect(menu_x, menu_y, menu_width, menu_height)
-            pg.draw.rect(self.world.surface, pg.Color('white'), menu_rect)
-
-            # Render the savegame file names
-            text_padding = 5
-            text_x = menu_x + text_padding
-            text_y = menu_y + text_padding
-
-            for i, savegame_file in enumerate(self.savegame_files):
-                text_rect = pg.Rect(text_x, text_y + i * (self.world.font.get_height() + text_padding), menu_width - 2 * text_padding, self.world.font.get_height() + text_padding)
-                pg.draw.rect(self.world.surface, pg.Color('lightgray'), text_rect)
-                self.world.surface.blit(self.world.font.render(savegame_file, True, pg.Color('black')), (text_rect.x + text_padding, text_rect.y + text_padding))
-
-            # Handle mouse clicks
-            mouse_pos = pg.mouse.get_pos()
-            if pg.mouse.get_pressed()[0]:
-                for i, savegame_file in enumerate(self.savegame_files):
-                    text_rect = pg.Rect(text_x, text_y + i * (self.world.font.get_height() + text_padding), menu_width - 2 * text_padding, self.world.font.get_height() + text_padding)
-                    if text_rect.collidepoint(mouse_pos):
+        self.layout()
+
+    def layout(self):
+        menu_width = 400
+        menu_height = 300
+        menu_x = self.world.surface.get_width() // 2 - menu_width // 2
+        menu_y = self.world.surface.get_height() // 2 - menu_height // 2
+        self.menu_rect = pg.Rect(menu_x, menu_y, menu_width, menu_height)
+
+        # The savegame file names as (file name, rect)
+        self.text_padding = 5
+        text_height = self.world.font.get_height() + self.text_padding
+        self.entries = [(savegame_file, pg.Rect(menu_x + self.text_padding, menu_y + self.text_padding + i * text_height, menu_width - 2 * self.text_padding, text_height))
+                        for i, savegame_file in enumerate(self.savegame_files)]
+        self.rect = self.menu_rect.unionall([rect for savegame_file, rect in self.entries])
+
+    def draw(self, surface):
+        # Render the savegame selection menu
+        pg.draw.rect(surface, pg.Color('white'), self.local(self.menu_rect))
+
+        # Render the savegame file names
+        for savegame_file, text_rect in self.entries:
+            text_rect = self.local(text_rect)
+            pg.draw.rect(surface, pg.Color('lightgray'), text_rect)
+            surface.blit(assets.render_text(self.world.font, savegame_file, True, pg.Color('black')), (text_rect.x + self.text_padding, text_rect.y + self.text_padding))
+
+    def handle_event(self, event):
+        if not self.visible:
+            return False
+        # Handle mouse clicks
+        if event.type == pg.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                for savegame_file, text_rect in self.entries:
+                    if text_rect.collidepoint(event.pos):
                         # Load the selected savegame file
                         self.visible = False
                         fp = os.path.join(self.folder_path, savegame_file)
                         print(f"load_game({fp})")
                         self.world.load_game(fp)
+                        return True
+            return self.rect.collidepoint(event.pos)
 
-            # Handle key presses
-            keys = pg.key.get_pressed()
-            if keys[pg.K_ESCAPE]:
-                self.visible = False
-                self.world.ui_menu.visible = True
+        # Handle key presses
+        if event.key == pg.K_ESCAPE:
+            self.visible = False
+            self.world.ui_menu.visible = True
+            return True
+        return False
 
     def get_savegame_files(self):
         """
@@ -174,11 +325,14 @@ class Load_Game_Selection(UI_Element):
         self.folder_path = os.path.join(os.path.dirname(__file__), savegame_folder)
         print("folder_path", self.folder_path)
         if os.path.exists(self.folder_path) and os.path.isdir(self.folder_path):
-            savegame_files = [f for f in os.listdir(self.folder_path) if os.path.isfile(os.path.join(self.folder_path, f))]
+            # only list the databases, not the WAL files next to them
+            savegame_files = [f for f in os.listdir(self.folder_path) if f.endswith(".db") and os.path.isfile(os.path.join(self.folder_path, f))]
 
         return savegame_files
 
 class Save_Game_Selection(UI_Element):
+    event_types = (pg.MOUSEBUTTONDOWN, pg.KEYDOWN)
+
     def __init__(self, world):
         super().__init__(world)
         self.visible = False
@@ -186,87 +340,103 @@ class Save_Game_Selection(UI_Element):
         self.selected_file = None
         self.new_file_name = ""
         self.textbox_active = False
+        self.layout()
+
+    def layout(self):
+        menu_width = 400
+        menu_height = 300
+        menu_x = self.world.surface.get_width() // 2 - menu_width // 2
+        menu_y = self.world.surface.get_height() // 2 - menu_height // 2
+        self.menu_rect = pg.Rect(menu_x, menu_y, menu_width, menu_height)
+
+        # The savegame file names as (file name, rect)
+        self.text_padding = 5
+        text_x = menu_x + self.text_padding
+        text_y = menu_y + self.text_padding
+        text_height = self.world.font.get_height() + self.text_padding
+        self.entries = [(savegame_file, pg.Rect(text_x, text_y + i * text_height, menu_width - 2 * self.text_padding, text_height))
+                        for i, savegame_file in enumerate(self.savegame_files)]
+
+        # The new file name textbox and the save button
+        textbox_width = menu_width - 2 * self.text_padding
+        textbox_height = self.world.font.get_height() + 10
+        self.textbox_rect = pg.Rect(text_x, text_y + len(self.savegame_files) * text_height + 10, textbox_width, textbox_height)
+        self.save_button_rect = pg.Rect(text_x, self.textbox_rect.y + textbox_height + self.text_padding, textbox_width, textbox_height)
+        self.rect = self.menu_rect.unionall([rect for savegame_file, rect in self.entries] + [self.textbox_rect, self.save_button_rect])
+
+    def draw(self, surface):
+        # Render the savegame selection menu
+        pg.draw.rect(surface, pg.Color('white'), self.local(self.menu_rect))
+
+        # Render the savegame file names
+        for savegame_file, text_rect in self.entries:
+            text_rect = self.local(text_rect)
+            pg.draw.rect(surface, pg.Color('lightgray'), text_rect)
+            surface.blit(assets.render_text(self.world.font, savegame_file, True, pg.Color('black')), (text_rect.x + self.text_padding, text_rect.y + self.text_padding))
+
+            if self.selected_file == savegame_file:
+                pg.draw.rect(surface, pg.Color('blue'), text_rect, 2)
+
+        # Render the new file name textbox
+        textbox_rect = self.local(self.textbox_rect)
+        pg.draw.rect(surface, pg.Color('white'), textbox_rect, 2)
+        surface.blit(assets.render_text(self.world.font, self.new_file_name, True, pg.Color('black')), (textbox_rect.x + self.text_padding, textbox_rect.y + 5))
+
+        # Render the save button
+        save_button_rect = self.local(self.save_button_rect)
+        pg.draw.rect(surface, pg.Color('green'), save_button_rect)
+        surface.blit(assets.render_text(self.world.font, "Save", True, pg.Color('white')), (save_button_rect.x + 10, save_button_rect.y + 10))
+
+    def handle_event(self, event):
+        if not self.visible:
+            return False
+        # Handle mouse clicks
+        if event.type == pg.MOUSEBUTTONDOWN:
+            if event.button != 1:
+                return self.rect.collidepoint(event.pos)
+            for savegame_file, text_rect in self.entries:
+                if text_rect.collidepoint(event.pos) and self.selected_file != savegame_file:
+                    # Select the savegame file
+                    self.selected_file = savegame_file
+                    self.dirty = True
+
+            if self.textbox_rect.collidepoint(event.pos):
+                # Clear the new file name textbox
+                self.new_file_name = ""
+                self.textbox_active = True
+                self.dirty = True
+
+            if self.save_button_rect.collidepoint(event.pos):
+                # Save the game
+                if self.selected_file:
+                    # Overwrite the selected savegame file
+                    fp = os.path.join(self.folder_path, self.selected_file)
+                    print(f"save_game({fp})")
+                    self.world.save_game(fp)
+                    self.visible = False
+                elif self.new_file_name:
+                    # Save the game with a new file name
+                    fp = os.path.join(self.folder_path, self.new_file_name)
+                    print(f"save_game({fp})")
+                    self.world.save_game(fp)
+                    self.visible = False
+            return self.rect.collidepoint(event.pos)
 
-    def render(self):
-        if self.visible:
-            # Render the savegame selection menu
-            menu_width = 400
-            menu_height = 300
-            menu_x = self.world.surface.get_width() // 2 - menu_width // 2
-            menu_y = self.world.surface.get_height() // 2 - menu_height // 2
-
-            menu_rect = pg.Rect(menu_x, menu_y, menu_width, menu_height)
-            pg.draw.rect(self.world.surface, pg.Color('white'), menu_rect)
-
-            # Render the savegame file names
-            text_padding = 5
-            text_x = menu_x + text_padding
-            text_y = menu_y + text_padding
-
-            for i, savegame_file in enumerate(self.savegame_files):
-                text_rect = pg.Rect(text_x, text_y + i * (self.world.font.get_height() + text_padding), menu_width - 2 * text_padding, self.world.font.get_height() + text_padding)
-                pg.draw.rect(self.world.surface, pg.Color('lightgray'), text_rect)
-                self.world.surface.blit(self.world.font.render(savegame_file, True, pg.Color('black')), (text_rect.x + text_padding, text_rect.y + text_padding))
-
-                if self.selected_file == savegame_file:
-                    pg.draw.rect(self.world.surface, pg.Color('blue'), text_rect, 2)
-
-            # Render the new file name textbox
-            textbox_width = menu_width - 2 * text_padding
-            textbox_height = self.world.font.get_height() + 10
-            textbox_rect = pg.Rect(text_x, text_y + len(self.savegame_files) * (self.world.font.get_height() + text_padding) + 10, textbox_width, textbox_height)
-            pg.draw.rect(self.world.surface, pg.Color('white'), textbox_rect, 2)
-            # pg.draw.rect(self.world.surface, pg.Color('lightgray'), textbox_rect)
-            self.world.surface.blit(self.world.font.render(self.new_file_name, True, pg.Color('black')), (textbox_rect.x + text_padding, textbox_rect.y + 5))
-
-            # Render the save button
-            save_button_rect = pg.Rect(text_x, textbox_rect.y + textbox_height + text_padding, textbox_width, textbox_height)
-            pg.draw.rect(self.world.surface, pg.Color('green'), save_button_rect)
-            self.world.surface.blit(self.world.font.render("Save", True, pg.Color('white')), (save_button_rect.x + 10, save_button_rect.y + 10))
-
-            # Handle mouse clicks
-            mouse_pos = pg.mouse.get_pos()
-            if pg.mouse.get_pressed()[0]:
-                for i, savegame_file in enumerate(self.savegame_files):
-                    text_rect = pg.Rect(text_x, text_y + i * (self.world.font.get_height() + text_padding), menu_width - 2 * text_padding, self.world.font.get_height())
-                    if text_rect.collidepoint(mouse_pos):
-                        # Select the savegame file
-                        self.selected_file = savegame_file
-
-                if textbox_rect.collidepoint(mouse_pos):
-                    # Clear the new file name textbox
-                    self.new_file_name = ""
-                    self.textbox_active = True
-
-                if save_button_rect.collidepoint(mouse_pos):
-                    # Save the game
-                    if self.selected_file:
-                        # Overwrite the selected savegame file
-                        fp = os.path.join(self.folder_path, self.selected_file)
-                        print(f"save_game({fp})")
-                        self.world.save_game(fp)
-                        self.visible = False
-                    elif self.new_file_name:
-                        # Save the game with a new file name
-                        fp = os.path.join(self.folder_path, self.new_file_name)
-                        print(f"save_game({fp})")
-                        self.world.save_game(fp)
-                        self.visible = False
-
-            # Handle key presses
-            keys = pg.key.get_pressed()
-            if keys[pg.K_ESCAPE]:
-                self.visible = False
-                self.world.ui_menu.visible = True
-
-            if self.selected_file is None and self.textbox_active:
-                # Handle typing in the new file name textbox
-                for event in pg.event.get():
-                    if event.type == pg.KEYDOWN:
-                        if event.key == pg.K_BACKSPACE:
-                            self.new_file_name = self.new_file_name[:-1]
-                        else:
-                            self.new_file_name += event.unicode
+        # Handle key presses
+        if event.key == pg.K_ESCAPE:
+            self.visible = False
+            self.world.ui_menu.visible = True
+            return True
+
+        if self.selected_file is None and self.textbox_active:
+            # Handle typing in the new file name textbox
+            if event.key == pg.K_BACKSPACE:
+                self.new_file_name = self.new_file_name[:-1]
+            else:
+                self.new_file_name += event.unicode
+            self.dirty = True
+            return True
+        return False
 
     def get_savegame_files(self):
         """
@@ -279,6 +449,7 @@ class Save_Game_Selection(UI_Element):
         self.folder_path = os.path.join(os.path.dirname(__file__), savegame_folder)
         print("folder_path", self.folder_path)
         if os.path.exists(self.folder_path) and os.path.isdir(self.folder_path):
-            savegame_files = [f for f in os.listdir(self.folder_path) if os.path.isfile(os.path.join(self.folder_path, f))]
+            # only list the databases, not the WAL files next to them
+            savegame_files = [f for f in os.listdir(self.folder_path) if f.endswith(".db") and os.path.isfile(os.path.join(self.folder_path, f))]
 
-        return savegame_files
\ No newline at end of file
+        return savegame_files
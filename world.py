@@ -1,7 +1,26 @@
 import pygame as pg
 from entities import *
+from assets import assets
 import sqlite3
+import math
+import threading
+import tempfile
+from array import array
+from time import perf_counter
 from ui import *
+from spatial import Spatial_Hash
+from store import Node_Store
+from ground import Ground_Layer, SAND, EMPTY
+from autosave import Autosaver
+from events import Event_Bus
+from loop import Render_Snapshot
+from scheduler import Scheduler
+from camera import Camera
+from chunks import Chunk_Manager, chunk_sql
+from worldgen import World_Generator
+import snapshot
+
+MAX_DIRTY_RECTS = 64 # the areas of changed static entities kept for render_dirty() before it redraws everything instead
 
 class World:
     """
@@ -9,16 +28,40 @@ class World:
 
     Attributes:
         name (str): The name of the world.
-        entities (list): A list of entities in the world.
+        entities (dict): The entities in the world, keyed by their ID.
+        next_id (int): The next free entity ID. IDs are never reused and are stored in the save file.
+        index (Spatial_Hash): The spatial index used for lookups by position.
+        nodes (Node_Store): The columnar store for ore nodes and trees, or None if NumPy is not installed. Its rows are not in entities.
+        chunks (Chunk_Manager): Generates the ore nodes and trees of procedural worlds and keeps only the chunks near the player in the node store.
+        ground (Ground_Layer): The ground tiles of the world.
         player (Entity): The player entity.
         surface (Surface): The surface to render the world on.
-        tile_size (int): The size of each tile in pixels.
+        camera (Camera): The view onto the world, which follows the player and zooms.
+        tile_size (int): The size of each tile in pixels, at the zoom level of the camera.
         time (int): The current time in the world.
+        tick_length (float): The length of a simulation step in seconds.
+        ticks (int): The number of simulation steps run so far.
+        alpha (float): How far rendering is between the last two simulation steps, from 0 to 1.
         font (Font): The font used for rendering text.
         debug_grid (bool): Flag indicating whether to render the debug grid.
+        render_stats (dict): The number of entities rendered and culled in the last frame.
+        save_stats (dict): The number of rows, wall time and throughput of the last save.
+        dirty (set): The entities that were added or changed since the last save.
+        removed_ids (list): The IDs of entities that were removed since the last save.
+        autosave (Autosaver): Writes the changes to the save file in the background.
+        scratch_fp (str): The path of the scratch file that a world without a save file evicts its chunks into, or None.
+        scratch_ready (Event): Set once the scratch file was written, so chunks can be evicted into it.
+        events (Event_Bus): Dispatches input events to the world and the UI elements.
+        lock (RLock): Held while the world is changed when the simulation runs on its own thread.
+        snapshot (Render_Snapshot): The latest render snapshot published by the simulation thread, or None.
+        scheduler (Scheduler): Runs timed callbacks, like message expiry, on the game clock.
+        background_color (tuple): The colour behind the ground.
+        background (Surface): The cached rendering of the ground, used by render_dirty().
+        background_version (int): Incremented when a static entity is added or moves, so render_dirty() redraws everything.
+        dirty_rects (list): The areas of static entities that changed in place or were removed since the last render, for render_dirty().
     """
 
-    def __init__(self, name, surface, time, font) -> None:
+    def __init__(self, name, surface, time, font, tick_rate: int = 60) -> None:
         """
         Initializes a new instance of the World class.
 
@@ -27,55 +70,170 @@ class World:
             surface (Surface): The surface to render the world on.
             time (int): The current time in the world.
             font (Font): The font used for rendering text.
+            tick_rate (int): The number of simulation steps per second of game time.
         """
         self.name = name
-        self.entities = []
+        self.entities = {}
+        self.next_id = 1
+        self.index = Spatial_Hash()
+        self.nodes = Node_Store(self, STORE_TYPES) if Node_Store.available() else None
+        self.ground = Ground_Layer(self)
+        self.chunks = Chunk_Manager(self)
         self.player = None
         self.surface = surface
-        self.tile_size = surface.get_width() // 20
+        self.camera = Camera(self, surface.get_width() // 20)
         self.time = time
+        self.tick_length = 1 / tick_rate
+        self.ticks = 0
+        self.alpha = 1.0
         self.font = font
         self.paused = False
         self.ui = []
         self.world_saved = False
         self.current_save_fp = None
+        self.scratch_fp = None
+        self.scratch_ready = threading.Event()
+        self.render_stats = {"rendered": 0, "culled": 0}
+        self.save_stats = {}
+        self.dirty = set()
+        self.removed_ids = []
+        self.autosave = Autosaver(self)
+        self.events = Event_Bus()
+        self.lock = threading.RLock()
+        self.snapshot = None
+        self.scheduler = Scheduler()
+        self.background_color = (100, 100, 100)
+        self.background = None
+        self.background_version = 0
+        self.background_key = None # what the cached background was rendered for
+        self.dirty_rects = []
+        self.shown_entities = {} # the dynamic entities on the screen after the last render_dirty(), with their rect, image and messages
+        self.shown_ui = {} # the UI elements on the screen after the last render_dirty(), with their rect and surface
+        self.db_con = None
+        self.db_cur = None
+        self.db_path = None
+
+    @property
+    def tile_size(self) -> int:
+        """
+        The size of each tile in pixels, at the zoom level of the camera.
+        """
+        return self.camera.tile_size
 
     def init_db(self, file_path: str, new_db: bool = False) -> bool:
-        self.db_con = sqlite3.connect(file_path)
-        self.db_cur = self.db_con.cursor()
+        """
+        Opens the database connection for a save file and creates the tables if necessary.
+        The connection is kept open and reused as long as the same file is used.
+
+        Args:
+            file_path (str): The path of the save file.
+            new_db (bool): Whether the file may be created.
+
+        Returns:
+            bool: True if the database is ready, False if the file does not exist.
+        """
         if not new_db:
             if not os.path.isfile(file_path):
                 print("File does not exist.")
                 return False
+        if self.db_con is not None and self.db_path == os.path.abspath(file_path):
+            return True
+        if self.db_con is not None:
+            self.db_con.close()
+        self.db_con = sqlite3.connect(file_path)
+        self.db_cur = self.db_con.cursor()
+        self.db_path = os.path.abspath(file_path)
+        # WAL avoids rewriting the whole journal on every save, and NORMAL sync is crash safe in WAL mode
+        self.db_cur.execute("PRAGMA journal_mode=WAL")
+        self.db_cur.execute("PRAGMA synchronous=NORMAL")
         print("Database opened successfully")
 
+        self.init_tables(self.db_con)
+        return True
+
+    @staticmethod
+    def init_tables(db_con: sqlite3.Connection) -> None:
+        """
+        Creates the tables of a save file that are missing and migrates older saves.
+        It only uses the given connection, so the autosaver's writer thread can set up a new file too.
+
+        Args:
+            db_con (Connection): The connection to the save file.
+        """
+        db_cur = db_con.cursor()
         # Check if entities table exists
-        self.db_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='entities'")
-        table_exists = self.db_cur.fetchone()
+        db_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='entities'")
+        table_exists = db_cur.fetchone()
         if not table_exists:
-            self.db_cur.execute("CREATE TABLE entities (id INTEGER PRIMARY KEY, type TEXT, posX INTEGER, posY INTEGER, quantity INTEGER)")
+            db_cur.execute("CREATE TABLE entities (id INTEGER PRIMARY KEY, type TEXT, posX INTEGER, posY INTEGER, quantity INTEGER)")
             print("Table entities created successfully")
 
         # Check if player_inventory table exists
-        self.db_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='player_inventory'")
-        table_exists = self.db_cur.fetchone()
+        db_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='player_inventory'")
+        table_exists = db_cur.fetchone()
         if not table_exists:
-            self.db_cur.execute("CREATE TABLE player_inventory (id INTEGER PRIMARY KEY, item TEXT, quantity INTEGER)")
+            db_cur.execute("CREATE TABLE player_inventory (id INTEGER PRIMARY KEY, item TEXT, quantity INTEGER)")
             print("Table player_inventory created successfully")
-        return True
+
+        # Check if chunks table exists
+        db_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='chunks'")
+        table_exists = db_cur.fetchone()
+        if not table_exists:
+            db_cur.execute("CREATE TABLE chunks (chunkX INTEGER, chunkY INTEGER, PRIMARY KEY (chunkX, chunkY))")
+            print("Table chunks created successfully")
+
+        # Check if meta table exists
+        db_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='meta'")
+        table_exists = db_cur.fetchone()
+        if not table_exists:
+            db_cur.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER)")
+            print("Table meta created successfully")
+
+        # Check if the entities table has the chunk columns. Older saves get them added; they are computed from the position,
+        # so the index on them can find the rows of a chunk without reading the whole table
+        columns = [row[1] for row in db_cur.execute("PRAGMA table_xinfo(entities)")]
+        if "chunkX" not in columns:
+            with db_con:
+                db_cur.execute(f"ALTER TABLE entities ADD COLUMN chunkX INTEGER AS {chunk_sql('posX')} VIRTUAL")
+                db_cur.execute(f"ALTER TABLE entities ADD COLUMN chunkY INTEGER AS {chunk_sql('posY')} VIRTUAL")
+                db_cur.execute("CREATE INDEX entities_chunk ON entities (chunkX, chunkY)")
+                # loading starts around the player, so remember where to find it
+                db_cur.execute("INSERT OR IGNORE INTO meta (key, value) SELECT 'player_id', id FROM entities WHERE type = 'Engineer' LIMIT 1")
+            print("Table entities migrated to chunk columns successfully")
 
     def add_entities(self, entities):
         """
         Adds entities to the world.
+        Entities without an ID get the next free one. Tiles are not kept as entities but added to the ground layer.
+        Ore nodes and trees become rows of the node store if there is one; the added objects stay bound to their rows as wrappers.
+        Many nodes at once, like the rows of a save file, are better added with add_save_rows(), which creates no objects.
 
         Args:
             entities (list): A list of entities to add.
         """
+        nodes = []
         for entity in entities:
-            self.entities.append(entity)
+            if isinstance(entity, Tile):
+                self.ground.set_tile(int(entity.posX), int(entity.posY), SAND)
+                continue
+            if entity.id is None:
+                entity.id = self.next_id
+                self.next_id += 1
+            else:
+                # keep the allocator ahead of IDs that were assigned elsewhere, e.g. by load_game
+                self.next_id = max(self.next_id, entity.id + 1)
+            if self.nodes is not None and self.nodes.handles(entity):
+                nodes.append(entity)
+                continue
+            self.entities[entity.id] = entity
+            self.index.insert(entity)
+            self.dirty.add(entity)
             entity.world = self
             if entity.is_player:
                 self.player = entity
+        if nodes:
+            self.nodes.add_entities(nodes)
+        self.invalidate_background()
 
     def remove_entity(self, entity):
         """
@@ -84,46 +242,525 @@ class World:
         Args:
             entity (Entity): The entity to remove.
         """
+        if not entity.is_player and entity.world is not None:
+            self.mark_dirty(entity)
         entity.world = None
-        self.entities.remove(entity)
+        self.removed_ids.append(entity.id)
+        if entity.id not in self.entities:
+            if self.nodes is not None:
+                self.nodes.remove(entity.id)
+            return
+        del self.entities[entity.id]
+        self.index.remove(entity)
+        self.dirty.discard(entity)
         if entity.is_player:
             self.player = None
 
+    def update_entity(self, entity, moved: bool = True):
+        """
+        Updates the spatial index and marks the entity for the next save after it moved or changed.
+
+        Args:
+            entity (Entity): The entity that changed.
+            moved (bool): Whether the entity moved or changed its size. Otherwise, e.g. after its quantity changed, only its area is redrawn.
+        """
+        if not entity.is_player:
+            if moved:
+                self.invalidate_background()
+            else:
+                self.mark_dirty(entity)
+        if entity.id not in self.entities:
+            if self.nodes is not None:
+                self.nodes.update(entity)
+            return
+        self.index.update(entity)
+        self.dirty.add(entity)
+
+    def clear_changes(self):
+        """
+        Marks the whole world as saved.
+        """
+        self.dirty = set()
+        self.removed_ids = []
+        self.ground.dirty_tiles = set()
+        self.chunks.dirty = set()
+        if self.nodes is not None:
+            self.nodes.dirty = set()
+        if self.player is not None:
+            self.player.inventory.dirty = False
+
+    def collect_changes(self) -> dict:
+        """
+        Collects the save file rows that changed since the last save and marks them as saved.
+        The rows are plain tuples, so they can be written on another thread.
+
+        Returns:
+            dict: The rows to delete and upsert, the changed ground tiles, the new chunks, the inventory rows if the inventory changed, the next free ID and the player ID.
+        """
+        deletes = [(entity_id,) for entity_id in self.removed_ids]
+        upserts = [(entity.id, entity.__class__.__name__, entity.posX, entity.posY, getattr(entity, "quantity", -1)) for entity in self.dirty]
+        if self.nodes is not None:
+            upserts.extend(self.nodes.save_rows(self.nodes.dirty))
+        tile_deletes = []
+        tile_inserts = []
+        for x, y in self.ground.dirty_tiles:
+            tile_deletes.append((x, y))
+            if self.ground.get_tile(x, y) != EMPTY:
+                tile_inserts.append((x, y))
+        chunks = list(self.chunks.dirty)
+        player_id = self.player.id if self.player is not None else None
+        inventory = None
+        if self.player is not None and self.player.inventory.dirty:
+            inventory = [(item[0].name, item[1]) for item in self.player.inventory.items()]
+        self.clear_changes()
+        return {"deletes": deletes, "upserts": upserts, "tile_deletes": tile_deletes, "tile_inserts": tile_inserts, "chunks": chunks, "inventory": inventory, "next_id": self.next_id, "player_id": player_id}
+
+    def get_entity(self, entity_id: int):
+        """
+        Returns the entity with an ID.
+
+        Args:
+            entity_id (int): The ID of the entity.
+
+        Returns:
+            Entity: The entity, or None if there is no entity with that ID in the world.
+        """
+        entity = self.entities.get(entity_id)
+        if entity is None and self.nodes is not None:
+            entity = self.nodes.get(entity_id)
+        return entity
+
+    def clear_entities(self):
+        """
+        Removes all entities from the world.
+        """
+        for entity in self.entities.values():
+            entity.world = None
+        self.entities = {}
+        self.index.clear()
+        self.invalidate_background()
+        self.scheduler.clear() # the pending timers belong to the removed entities
+        if self.nodes is not None:
+            self.nodes.clear()
+        self.chunks.clear()
+        self.player = None
+        self.dirty = set()
+        self.removed_ids = []
+
+    def entities_at(self, x: float, y: float) -> list:
+        """
+        Returns the entities covering a point.
+
+        Args:
+            x (float): The x-coordinate of the point in world coordinates.
+            y (float): The y-coordinate of the point in world coordinates.
+
+        Returns:
+            list: The entities whose footprint contains the point.
+        """
+        result = []
+        for entity in self.index.query(x, y, x, y):
+            width, height = entity.get_render_size()
+            if entity.posX <= x < entity.posX + width and entity.posY - height < y <= entity.posY:
+                result.append(entity)
+        if self.nodes is not None:
+            result.extend(self.nodes.wrap(row) for row in self.nodes.query_point(x, y))
+        return result
+
+    def entities_in_rect(self, left: float, bottom: float, right: float, top: float, nodes: bool = True) -> list:
+        """
+        Returns the entities overlapping an area.
+
+        Args:
+            left, bottom, right, top (float): The area in world coordinates.
+            nodes (bool): Whether to include the rows of the node store, as wrappers.
+
+        Returns:
+            list: The entities whose footprint overlaps the area.
+        """
+        result = []
+        for entity in self.index.query(left, bottom, right, top):
+            width, height = entity.get_render_size()
+            # entities are drawn from their position to the right and downwards
+            if entity.posX + width > left and entity.posX < right and entity.posY > bottom and entity.posY - height < top:
+                result.append(entity)
+        if nodes and self.nodes is not None:
+            result.extend(self.nodes.wrap(row) for row in self.nodes.query_rect(left, bottom, right, top))
+        return result
+
+    def nearest(self, entity_type: type, pos: tuple, radius: float):
+        """
+        Returns the entity of a type closest to a position.
+
+        Args:
+            entity_type (type): The class (or tuple of classes) to look for.
+            pos (tuple): The position in world coordinates.
+            radius (float): The maximum distance from the position.
+
+        Returns:
+            Entity: The closest matching entity, or None if there is none within the radius.
+        """
+        x, y = pos
+        closest = None
+        closest_dist = radius
+        for entity in self.index.query(x - radius, y - radius, x + radius, y + radius):
+            if isinstance(entity, entity_type):
+                dist = math.hypot(entity.posX - x, entity.posY - y)
+                if dist <= closest_dist:
+                    closest = entity
+                    closest_dist = dist
+        if self.nodes is not None:
+            found = self.nodes.nearest(entity_type, pos, closest_dist)
+            if found is not None:
+                closest = self.nodes.wrap(found[0])
+        return closest
+
+    def screen_to_world(self, pos: tuple) -> tuple:
+        """
+        Converts a position on the surface to world coordinates.
+
+        Args:
+            pos (tuple): The position in pixels.
+
+        Returns:
+            tuple: The position in world coordinates as floats.
+        """
+        return self.camera.screen_to_world(pos)
+
+    def get_ticks(self) -> int:
+        """
+        Returns the game time in milliseconds, counted in simulation steps.
+        Unlike the wall clock it stands still while the game is not simulated and runs faster in fast-forwarded headless runs.
+        """
+        return int(self.ticks * self.tick_length * 1000)
+
+    def step(self) -> None:
+        """
+        Advances the simulation by one fixed step.
+        """
+        if self.player:
+            self.player.move(self.tick_length)
+        # generate or load the chunks the player is heading into
+        self.chunks.update()
+        self.ticks += 1
+        self.scheduler.run(self.get_ticks())
+
+    def schedule(self, delay: int, callback, *args):
+        """
+        Schedules a callback on the game clock.
+
+        Args:
+            delay (int): The delay in milliseconds of game time.
+            callback (callable): The function to call.
+            *args: The arguments for the callback.
+
+        Returns:
+            Timer: The timer, which can be cancelled.
+        """
+        return self.scheduler.schedule(self.get_ticks() + delay, callback, *args)
+
+    def get_visible_area(self) -> tuple:
+        """
+        Returns the part of the world that is visible on the surface.
+
+        Returns:
+            tuple: The visible area in world coordinates as (left, bottom, right, top).
+        """
+        return self.camera.get_visible_area()
+
+    def count_entities(self) -> int:
+        """
+        Returns the number of entities in the world, including the rows of the node store.
+        """
+        return len(self.entities) + (len(self.nodes) if self.nodes is not None else 0)
+
+    def get_draw_list(self) -> list:
+        """
+        Returns the visible entities in drawing order. Rows of the node store are culled with one vectorised query and are not wrapped.
+        When the camera is zoomed out far, the rows are left out; render_ground() draws them as coloured chunks instead.
+
+        Returns:
+            list: (layer, -posY, posX, entity, row) tuples, sorted back to front: lower layers first, then from the top of the screen downwards.
+                For rows of the node store, entity is the object that draws the row and row is the row number; for other entities row is None.
+        """
+        area = self.get_visible_area()
+        visible = [(entity.layer, -entity.posY, entity.posX, entity, None) for entity in self.entities_in_rect(*area, nodes=False)]
+        if self.nodes is not None and not self.camera.lod:
+            rows = self.nodes.query_rect(*area)
+            nodes = self.nodes
+            visible.extend((1, -y, x, nodes.drawable(row), row) for row, x, y in zip(rows.tolist(), nodes.posX[rows].tolist(), nodes.posY[rows].tolist()))
+        visible.sort(key=lambda item: item[:3])
+        return visible
+
+    def build_snapshot(self) -> Render_Snapshot:
+        """
+        Packs the visible entities into a render snapshot. Only IDs, type codes, positions and message texts are copied, not the entities.
+
+        Returns:
+            Render_Snapshot: The new snapshot.
+        """
+        ids = array('q')
+        codes = array('h')
+        positions = array('d')
+        messages = []
+        for layer, negY, posX, entity, row in self.get_draw_list():
+            ids.append(entity.id if row is None else int(self.nodes.ids[row]))
+            codes.append(-1 if row is None else int(self.nodes.type_codes[row]))
+            # only moving entities remember where they were before the step
+            positions.extend((posX, -negY, getattr(entity, "prevX", posX), getattr(entity, "prevY", -negY)))
+            if entity.messages:
+                messages.append((ids[-1], tuple(message.content for message in entity.messages)))
+        player = (self.player.posX, self.player.posY, self.player.prevX, self.player.prevY) if self.player is not None else None
+        return Render_Snapshot(self.ticks, perf_counter(), ids, codes, positions, player, tuple(messages), self.count_entities() - len(ids))
+
+    def render_snapshot(self, snapshot: Render_Snapshot) -> None:
+        """
+        Renders the world from a snapshot of the simulation thread. Positions are interpolated by the time since the snapshot was published.
+        The world lock is held while the ground is drawn and the objects that draw the entities are looked up; the entity sprites are
+        drawn while the simulation runs the next step. Rows of the node store are drawn by the prototypes of their types, so the sprites
+        are drawn without touching the store.
+
+        Args:
+            snapshot (Render_Snapshot): The snapshot to draw.
+        """
+        alpha = min((perf_counter() - snapshot.time) / self.tick_length, 1.0)
+        with self.lock:
+            # the camera follows the player as it is drawn from the snapshot, not where the simulation has moved it since
+            self.alpha = alpha
+            if snapshot.player is not None:
+                x, y, prevX, prevY = snapshot.player
+                self.camera.update((prevX + (x - prevX) * alpha, prevY + (y - prevY) * alpha))
+            else:
+                self.camera.update()
+            self.render_ground()
+            self.dirty_rects = [] # only render_dirty() uses them
+            nodes = self.nodes
+            drawables = [self.entities.get(entity_id) if code < 0 else nodes.prototype(code) for entity_id, code in zip(snapshot.ids, snapshot.codes)]
+        messages = dict(snapshot.messages)
+        positions = snapshot.positions
+        for i, entity in enumerate(drawables):
+            if entity is None or entity.world is None: # removed since the snapshot was taken
+                continue
+            x, y, prevX, prevY = positions[i * 4:i * 4 + 4]
+            entity.render((prevX + (x - prevX) * alpha, prevY + (y - prevY) * alpha), messages.get(snapshot.ids[i], ()))
+        self.render_stats = {"rendered": len(snapshot.ids), "culled": snapshot.culled}
+        with self.lock:
+            for element in self.ui_elements:
+                element.render()
+
+    def render_ground(self) -> None:
+        """
+        Renders the ground, and the ore fields and forests as coloured chunks if the camera is zoomed out far.
+        """
+        self.ground.render()
+        if self.camera.lod and self.nodes is not None:
+            self.nodes.render_lod()
+
+    def invalidate_background(self) -> None:
+        """
+        Marks the cached background as outdated, after a static entity was added or moved.
+        """
+        self.background_version += 1
+
+    def mark_dirty(self, entity) -> None:
+        """
+        Marks the area of a static entity to be redrawn by the next render_dirty(), after it changed in place or before it is removed.
+        If too many areas pile up, e.g. because nothing is rendered with render_dirty(), everything is redrawn instead.
+
+        Args:
+            entity (Entity): The entity that changed. It must still be in the world.
+        """
+        if len(self.dirty_rects) < MAX_DIRTY_RECTS:
+            self.dirty_rects.append(entity.get_dirty_rect())
+        else:
+            self.invalidate_background()
+
+    def build_background(self) -> None:
+        """
+        Renders the background colour and the ground into the cached background.
+        """
+        surface = self.surface
+        if self.background is None or self.background.get_size() != surface.get_size():
+            self.background = pg.Surface(surface.get_size()).convert()
+        # the render methods draw on self.surface, so point it at the background while baking
+        self.surface = self.background
+        try:
+            self.background.fill(self.background_color)
+            self.render_ground()
+        finally:
+            self.surface = surface
+
+    def render_dirty(self) -> list:
+        """
+        Renders the world by only redrawing the parts of the surface that changed since the last call.
+        The ground comes from a cached background. Only dynamic entities (the player and entities with messages) and the UI
+        are checked for changes; static entities only change through add_entities, update_entity and remove_entity, which force a full redraw
+        when an entity is added or moves, and otherwise mark the area of the entity in dirty_rects.
+        A changed area is redrawn from the background up, with every entity that overlaps it in drawing order and the UI on top,
+        clipped to the area. A frame in which nothing moved draws nothing.
+        Don't mix with render() on the same surface; render() makes the next call redraw everything.
+
+        Returns:
+            list: The changed areas as Rects, to be passed to pg.display.update().
+        """
+        self.camera.update()
+        draw_list = self.get_draw_list()
+
+        # what is on the screen this frame
+        shown_entities = {}
+        for layer, negY, posX, entity, row in draw_list:
+            if entity.is_player or entity.messages:
+                pos = None if row is None else (posX, -negY)
+                shown_entities[entity] = (entity.get_dirty_rect(pos), entity.image, tuple(message.content for message in entity.messages), pos)
+        shown_ui = {}
+        for element in self.ui_elements:
+            if element.prepare():
+                shown_ui[element] = (pg.Rect(element.rect), element.surface)
+
+        screen = self.surface.get_rect()
+        key = (self.background_version, self.ground.version, self.camera.get_view(), self.surface.get_size())
+        if key != self.background_key:
+            self.build_background()
+            self.background_key = key
+            rects = [screen]
+        else:
+            # areas where something appeared, changed or disappeared; the rect is the first item of each state
+            rects = []
+            for shown, last_shown in ((shown_entities, self.shown_entities), (shown_ui, self.shown_ui)):
+                for thing, state in shown.items():
+                    last_state = last_shown.get(thing)
+                    if state != last_state:
+                        rects.append(state[0])
+                        if last_state is not None:
+                            rects.append(last_state[0])
+                for thing, last_state in last_shown.items():
+                    if thing not in shown:
+                        rects.append(last_state[0])
+            rects.extend(self.dirty_rects)
+        self.dirty_rects = []
+        self.shown_entities = shown_entities
+        self.shown_ui = shown_ui
+
+        # merge overlapping areas, so less is drawn twice
+        merged = []
+        for rect in rects:
+            rect = rect.clip(screen)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            for i, other in enumerate(merged):
+                if rect.colliderect(other):
+                    merged[i] = other.union(rect)
+                    break
+            else:
+                merged.append(rect)
+
+        # redraw each area from the ground up, so entities in front of the dynamic ones still cover them
+        if merged:
+            items = []
+            for layer, negY, posX, entity, row in draw_list:
+                pos = None if row is None else (posX, -negY)
+                items.append((entity, pos, shown_entities[entity][0] if entity in shown_entities else entity.get_dirty_rect(pos)))
+            for rect in merged:
+                self.surface.set_clip(rect)
+                self.surface.blit(self.background, rect, rect)
+                for entity, pos, entity_rect in items:
+                    if entity_rect.colliderect(rect):
+                        entity.render(pos)
+                for element, (element_rect, surface) in shown_ui.items():
+                    if element_rect.colliderect(rect):
+                        self.surface.blit(surface, element_rect)
+            self.surface.set_clip(None)
+        self.render_stats = {"rendered": len(draw_list), "culled": self.count_entities() - len(draw_list), "dirty_rects": len(merged)}
+        return merged
+
     def render(self):
         """
-        Renders the world. Each entity is rendered in turn, and the debug grid is rendered if enabled.
+        Renders the world. Each visible entity is rendered in turn, and the debug grid is rendered if enabled.
         Then UI is rendered.
         """
-        # Render the world
-        for entity in self.entities:
-            entity.render()
+        self.background_key = None # the next render_dirty() has to redraw everything
+        self.dirty_rects = []
+        self.camera.update()
+        # Render the ground
+        self.render_ground()
+
+        # Render the world, skipping entities that are completely outside the window
+        visible = self.get_draw_list()
+        for layer, negY, posX, entity, row in visible:
+            # rows of the node store are drawn by a shared prototype at the position of the row
+            entity.render(None if row is None else (posX, -negY))
+        self.render_stats = {"rendered": len(visible), "culled": self.count_entities() - len(visible)}
 
         # Render the UI
         for element in self.ui_elements:
             element.render()
 
-    def cursor(self, clicked_sprites, mouse_status):
+    def handle_event(self, event) -> bool:
+        """
+        Handles the input events that reach the world: clicks on entities, zooming and the keyboard shortcuts.
+
+        Args:
+            event (Event): The event.
+
+        Returns:
+            bool: True if the event was consumed.
+        """
+        if event.type == pg.MOUSEBUTTONDOWN:
+            # get list of sprites that are under the mouse cursor
+            clicked_sprites = self.entities_at(*self.screen_to_world(event.pos))
+            self.cursor(clicked_sprites, (event.button == 1, event.button == 2, event.button == 3), event.pos)
+            return True
+        if event.type == pg.MOUSEWHEEL:
+            # scrolling up zooms in
+            self.camera.set_zoom(self.camera.zoom + event.y)
+            return True
+        if event.type == pg.KEYDOWN:
+            if event.key == pg.K_F1:
+                self.ui_grid.toggle()
+                return True
+            if event.key == pg.K_F2:
+                self.ui_inventory_bar.toggle()
+                return True
+            if event.key == pg.K_F5:
+                self.quick_save()
+                return True
+            if event.key == pg.K_F9:
+                self.quick_load()
+                return True
+            if event.key in (pg.K_PLUS, pg.K_EQUALS, pg.K_KP_PLUS):
+                self.camera.zoom_in()
+                return True
+            if event.key in (pg.K_MINUS, pg.K_KP_MINUS):
+                self.camera.zoom_out()
+                return True
+            # open menu if esc is pressed
+            if event.key == pg.K_ESCAPE:
+                self.ui_menu.toggle()
+                return True
+        return False
+
+    def cursor(self, clicked_sprites, mouse_status, pos=None):
         """
         Handles cursor interaction.
 
         Args:
             clicked_sprites (list): A list of sprites that were clicked.
             mouse_status (tuple): A tuple representing the state of the mouse buttons.
+            pos (tuple): The position of the mouse cursor. Defaults to the current position.
 
         Returns:
             None
         """
         left, middle, right = mouse_status
-        centerPosX = self.surface.get_width() // 2
-        centerPosY = self.surface.get_height() // 2
         ts = self.tile_size
 
         # Render the cursor
-        x, y = pg.mouse.get_pos()
+        x, y = pos if pos is not None else pg.mouse.get_pos()
 
         #calculate world postion of cursor
-        cursorWorldPosX = (x - centerPosX) // ts
-        cursorWorldPosY = (centerPosY - y) // ts + 1
+        worldX, worldY = self.camera.screen_to_world((x, y))
+        cursorWorldPosX = math.floor(worldX)
+        cursorWorldPosY = math.floor(worldY) + 1
         # print("selected tile:",cursorWorldPosX, cursorWorldPosY)
         for entity in clicked_sprites:
             print(entity.__repr__())
@@ -135,112 +772,325 @@ class World:
                 entity.set_message(f"Ich bin ein ofen, füttere mich!")
             if entity.posX == cursorWorldPosX and entity.posY == cursorWorldPosY:
                 # print(entity.__repr__(),"at cursor position")
-                blitX = centerPosX + entity.posX * ts
-                blitY = centerPosY - entity.posY * ts
-                self.surface.blit(pg.transform.scale(pg.image.load("../factory-game/cursor.png"),[ts, ts]), (blitX, blitY))
+                blitX, blitY = self.camera.world_to_screen(entity.posX, entity.posY)
+                self.surface.blit(assets.scale(assets.load("cursor.png"), [ts, ts]), (blitX, blitY))
 
     def save_game(self, file_path: str) -> None:
         """
         Saves the game state to a file.
+        If the file is the current save file, only the changes since the last save are written, on the autosave thread.
+        Otherwise all rows are written with executemany in a single transaction.
         """
         if not file_path.endswith(".db"):
             file_path += ".db"
-        self.init_db(file_path, new_db=True) # initialize the database connection
-        # Save entities
-        try:
-            self.db_cur.execute("DELETE FROM entities")
-            for entity in self.entities:
-                quantity = entity.quantity if hasattr(entity, "quantity") else -1
-                self.db_cur.execute("INSERT INTO entities (type, posX, posY, quantity) VALUES (?, ?, ?, ?)", (entity.__class__.__name__, entity.posX, entity.posY, quantity))
-            self.db_con.commit()
-            print("Game saved successfully.")
-        except sqlite3.OperationalError:
-            print("Saving failed. entities table not found.")
+        if self.world_saved and self.current_save_fp == file_path:
+            self.autosave.save()
+            print("Game saved successfully. Changes are written in the background.")
+            return
+        self.autosave.flush() # pending autosaves must not interleave with a full save
+        if self.world_saved and self.chunks.has_evicted():
+            # the evicted chunks only exist in the current save file, so it is copied and the changes are written on top
+            self.autosave.save()
+            self.autosave.flush()
+            self.init_db(self.current_save_fp)
+            target = sqlite3.connect(file_path)
+            self.db_con.backup(target)
+            target.close()
+            self.init_db(file_path)
+            self.current_save_fp = file_path
+            self.remove_scratch()
+            print("Game saved successfully. The save file was copied with its evicted chunks.")
+            return
+        self.chunks.finish_stream() # every row has to be in the world before the file is rewritten
+        self.init_db(file_path, new_db=True) # initialize (or reuse) the database connection
+        start = perf_counter()
 
-        # Save player inventory
+        save = self.collect_save()
         try:
-            self.db_cur.execute("DELETE FROM player_inventory")
-            for item in self.player.inventory.items():
-                self.db_cur.execute("INSERT INTO player_inventory (item, quantity) VALUES (?, ?)", (item[0].__class__.__name__, item[1]))
-            self.db_con.commit()
-            print("Inventory saved successfully.")
+            self.write_save(self.db_con, save)
         except sqlite3.OperationalError:
-            print("Saving failed. player_inventory table not found.")
+            print("Saving failed. entities, player_inventory, chunks or meta table not found.")
+            return
+
+        elapsed = perf_counter() - start
+        rows = len(save["entities"]) + len(save["inventory"])
+        self.save_stats = {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed if elapsed > 0 else float("inf")}
+        self.clear_changes()
+        self.world_saved = True
+        self.current_save_fp = file_path
+        self.remove_scratch()
+        print(f"Game saved successfully. {rows} rows in {elapsed:.3f}s ({self.save_stats['rows_per_second']:.0f} rows/s)")
+
+    def collect_save(self) -> dict:
+        """
+        Builds all rows of a full save up front, so the transaction of write_save() only does inserts.
+
+        Returns:
+            dict: The entity and inventory rows, the next ID, the player ID, the generated chunks and the seed.
+        """
+        entity_rows = [(entity.id, entity.__class__.__name__, entity.posX, entity.posY, getattr(entity, "quantity", -1)) for entity in self.entities.values()]
+        if self.nodes is not None:
+            entity_rows.extend(self.nodes.save_rows())
+        # ground tiles are stored as Tile rows with negative IDs, so they never collide with entity IDs
+        entity_rows.extend((-row, "Tile", x, y, -1) for row, (x, y, tile_id) in enumerate(self.ground.tiles(), start=1))
+        inventory_rows = []
+        if self.player is not None:
+            inventory_rows = [(item[0].name, item[1]) for item in self.player.inventory.items()]
+        return {"entities": entity_rows,
+                "inventory": inventory_rows,
+                "next_id": self.next_id,
+                "player_id": self.player.id if self.player is not None else None,
+                "chunks": list(self.chunks.generated),
+                "seed": self.chunks.generator.seed if self.chunks.generator is not None else None}
+
+    @staticmethod
+    def write_save(db_con: sqlite3.Connection, save: dict) -> None:
+        """
+        Replaces the contents of a save file with a full save in a single transaction.
+
+        Args:
+            db_con (Connection): The connection to the save file. Its tables must exist.
+            save (dict): The rows, as returned by collect_save().
+
+        Raises:
+            sqlite3.OperationalError: If a table is missing.
+        """
+        # the connection context manager commits once at the end, or rolls back on error
+        with db_con:
+            # building the chunk index once after the inserts is faster than updating it for every row
+            db_con.execute("DROP INDEX IF EXISTS entities_chunk")
+            db_con.execute("DELETE FROM entities")
+            db_con.executemany("INSERT INTO entities (id, type, posX, posY, quantity) VALUES (?, ?, ?, ?, ?)", save["entities"])
+            db_con.execute("CREATE INDEX entities_chunk ON entities (chunkX, chunkY)")
+            db_con.execute("DELETE FROM player_inventory")
+            db_con.executemany("INSERT INTO player_inventory (item, quantity) VALUES (?, ?)", save["inventory"])
+            db_con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (save["next_id"],))
+            if save["player_id"] is not None:
+                db_con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('player_id', ?)", (save["player_id"],))
+            db_con.execute("DELETE FROM chunks")
+            db_con.executemany("INSERT INTO chunks (chunkX, chunkY) VALUES (?, ?)", save["chunks"])
+            if save["seed"] is not None:
+                db_con.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seed', ?)", (save["seed"],))
+            else:
+                db_con.execute("DELETE FROM meta WHERE key = 'seed'")
+
+    def save_scratch(self) -> None:
+        """
+        Saves a world that has no save file into a scratch file in the temporary folder, so the chunk manager can evict chunks into it
+        and memory stays bounded. The rows are collected right away, but the file is created and written on the autosaver's writer thread,
+        since this is called during a simulation step; scratch_ready is set once it is on disk. The changes are autosaved into it like
+        into a save file. save_game() copies it to the chosen file; the scratch file is deleted when the world is saved or loaded elsewhere
+        and when the database is closed.
+        """
+        handle, file_path = tempfile.mkstemp(prefix="factory-scratch-", suffix=".db")
+        os.close(handle) # SQLite opens the empty file as a new database
+        save = self.collect_save()
+        ready = threading.Event()
+        def write_scratch(db_con: sqlite3.Connection) -> None:
+            self.init_tables(db_con)
+            self.write_save(db_con, save)
+            ready.set()
+        # the file is written by the autosaver, so the step that fills memory does not wait for the disk
+        self.autosave.submit(file_path, write_scratch)
+        self.clear_changes()
+        self.world_saved = True
+        self.current_save_fp = file_path
+        self.scratch_fp = file_path
+        self.scratch_ready = ready
+        print(f"Far chunks are unloaded into the scratch file {file_path} until the game is saved")
+
+    def remove_scratch(self) -> None:
+        """
+        Deletes the scratch file, unless it is still the current save file.
+        """
+        if self.scratch_fp is None or self.scratch_fp == self.current_save_fp:
+            return
+        for path in (self.scratch_fp, self.scratch_fp + "-wal", self.scratch_fp + "-shm"):
+            try:
+                os.remove(path)
+            except OSError: # already gone, or still opened by another connection on systems that lock open files
+                pass
+        self.scratch_fp = None
+
+    def add_save_rows(self, rows, entity_types: dict = None) -> None:
+        """
+        Adds rows of the entities table of a save file to the world, turning them into entities through ENTITY_TYPES.
+        The rows are not marked as changed, since they are already in the save file.
+
+        Args:
+            rows (list): The rows as (id, type, posX, posY, quantity) tuples.
+            entity_types (dict): Counts the rows of each type, if given.
 
-    def load_game(self, file_path: str) -> None:
+        Raises:
+            ValueError: If a row has an unknown type.
+        """
+        batch = []
+        node_rows = []
+        tiles = []
+        for row in rows:
+            row_id, entity_type, posX, posY, quantity = row
+            if entity_types is not None:
+                entity_types[entity_type] = entity_types.get(entity_type, 0) + 1
+            if entity_type == "Tile":
+                self.ground.set_tile(posX, posY, SAND)
+                tiles.append((posX, posY))
+            elif self.nodes is not None and ENTITY_TYPES.get(entity_type) in self.nodes.codes:
+                # store rows go into the columns directly, without creating an object
+                node_rows.append(row)
+            elif entity_type in ENTITY_TYPES:
+                entity = ENTITY_TYPES[entity_type].from_save(posX, posY, quantity)
+                entity.id = row_id
+                batch.append(entity)
+            else:
+                raise ValueError(f"Entity type not found: {entity_type}")
+        self.add_entities(batch)
+        self.dirty.difference_update(batch)
+        self.ground.dirty_tiles.difference_update(tiles)
+        if node_rows:
+            ids, types, xs, ys, quantities = zip(*node_rows)
+            codes = [self.nodes.codes[ENTITY_TYPES[entity_type]] for entity_type in types]
+            self.nodes.extend(ids, codes, xs, ys, quantities, changed=False)
+            self.next_id = max(self.next_id, max(ids) + 1)
+
+    def load_game(self, file_path: str, batch_size: int = 10000) -> None:
         """
         Loads the game state from a file.
+        Only the chunks around the saved player position are loaded right away, through the index on the chunk columns,
+        so the first frame does not wait for the rest of a large save. The other rows are streamed in the background
+        and added over the next simulation steps; in procedural worlds the chunk manager reads their ore nodes and trees on demand instead.
+
+        Args:
+            file_path (str): The path of the save file.
+            batch_size (int): The number of rows fetched from the database at once.
         """
-        self.init_db(file_path) # initialize the database connection
+        self.autosave.flush() # finish writing the previous save first
+        if not self.init_db(file_path): # initialize the database connection
+            return
+        start = perf_counter()
+
         # helper function for loading the inventory
         def load_inventory() -> Inventory:
             try:
                 # Load player inventory by querying the database
-                self.db_cur.execute("SELECT * FROM player_inventory")
-                inventory = self.db_cur.fetchall() # fetch all rows
+                self.db_cur.execute("SELECT item, quantity FROM player_inventory ORDER BY id")
+                inventory = self.db_cur.fetchall() # the inventory only has a few rows
                 print("loaded inventory:", inventory)
                 new_inventory = Inventory(8) # create a new inventory
-                for item in inventory: # iterate over the items in the inventory
-                    if item[1] == "Oven":
-                        new_inventory.add_item(Oven(0, 0), item[2])
-                    elif item[1] == "CopperOre":
-                        new_inventory.add_item(Copper_Ore(0, 0, 0), item[2])
-                    elif item[1] == "IronOre":
-                        new_inventory.add_item(Iron_Ore(0, 0, 0), item[2])
-                    elif item[1] == "Coal":
-                        new_inventory.add_item(Coal(0, 0, 0), item[2])
-                    elif item[1] == "Tree":
-                        new_inventory.add_item(Tree(0, 0), item[2])
-                    else:
-                        raise ValueError(f"Item type not found: {item[1]}")
+                for item, quantity in inventory: # iterate over the items in the inventory
+                    # older saves stored class names, get_item_type() maps them to item types
+                    new_inventory.add_item(get_item_type(item), quantity)
                 return new_inventory
             except sqlite3.OperationalError:
                 print("Loading failed. player_inventory table not found. Please save the game first.")
 
-        # helper function for loading the entities
-        def load_entities() -> None:
-            self.entities = []
-            # iterate over the entities and create instances of the corresponding classes
+        # helper function for loading the entities around the player
+        def load_entities(area: tuple) -> None:
+            entity_types = {}
+            count = 0
+            min_x, min_y, max_x, max_y = area
             try:
-                # Load entities by querying the database
-                self.db_cur.execute("SELECT * FROM entities")
-                entities = self.db_cur.fetchall() # fetch all rows
-                entity_types = {}
-
-                for entity in entities:
-                    if entity[1] not in entity_types:
-                        entity_types[entity[1]] = 1
-                    else:
-                        entity_types[entity[1]] += 1
-                print(f"loaded {len(entities)} entities. Types: {entity_types}")
-                for entity in entities:
-                    if entity[1] == "Engineer":
-                        self.add_entities([Engineer(entity[2], entity[3], load_inventory())])
-                    elif entity[1] == "Oven":
-                        self.add_entities([Oven(entity[2], entity[3])])
-                    elif entity[1] == "CopperOre":
-                        self.add_entities([Copper_Ore(entity[2], entity[3], entity[4])])
-                    elif entity[1] == "IronOre":
-                        self.add_entities([Iron_Ore(entity[2], entity[3], entity[4])])
-                    elif entity[1] == "Coal":
-                        self.add_entities([Coal(entity[2], entity[3], entity[4])])
-                    elif entity[1] == "Tree":
-                        self.add_entities([Tree(entity[2], entity[3])])
-                    elif entity[1] == "Tile":
-                        self.add_entities([Tile(entity[2], entity[3])])
-                    else:
-                        raise ValueError(f"Entity type not found: {entity[1]}")
+                # one query per column of chunks, so each is a single range of the index
+                for chunkX in range(min_x, max_x + 1):
+                    cursor = self.db_con.execute("SELECT id, type, posX, posY, quantity FROM entities WHERE chunkX = ? AND chunkY BETWEEN ? AND ?", (chunkX, min_y, max_y))
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        self.add_save_rows(rows, entity_types)
+                        count += len(rows)
+                print(f"loaded {count} entities. Types: {entity_types}")
             except sqlite3.OperationalError:
                 print("Loading failed. entities not found. Please save the game first.")
 
-        # Load entities and inventory
-        load_entities()
+        self.clear_entities()
+        self.ground.clear()
+        meta = dict(self.db_cur.execute("SELECT key, value FROM meta").fetchall())
+        # saves without a next_id get it from the highest entity ID. Rows that are streamed later must not collide with new IDs either
+        max_id = self.db_cur.execute("SELECT MAX(id) FROM entities").fetchone()[0]
+        self.next_id = max(meta.get("next_id", 1), (max_id or 0) + 1)
+        # procedural worlds have a seed and a list of the chunks that were generated
+        seed = meta.get("seed")
+        self.chunks.generator = World_Generator(seed) if seed is not None and World_Generator.available() else None
+        self.chunks.generated = set(self.db_cur.execute("SELECT chunkX, chunkY FROM chunks").fetchall())
+
+        # Load the chunks around the player first
+        player = None
+        if "player_id" in meta:
+            player = self.db_cur.execute("SELECT posX, posY FROM entities WHERE id = ?", (meta["player_id"],)).fetchone()
+        centerX, centerY = Chunk_Manager.chunk_of(*player) if player is not None else (0, 0)
+        radius = self.chunks.radius
+        area = (centerX - radius, centerY - radius, centerX + radius, centerY + radius)
+        load_entities(area)
+        self.chunks.loaded = {(x, y) for x, y in self.chunks.generated if area[0] <= x <= area[2] and area[1] <= y <= area[3]}
+        if self.player is not None:
+            inventory = load_inventory()
+            if inventory is not None:
+                self.player.inventory = inventory
+
+        # and stream the rest. The ore nodes and trees of procedural worlds are left to the chunk manager
+        query = "SELECT id, type, posX, posY, quantity FROM entities WHERE NOT (chunkX BETWEEN ? AND ? AND chunkY BETWEEN ? AND ?)"
+        params = (area[0], area[2], area[1], area[3])
+        if self.chunks.enabled:
+            names = self.nodes.type_names
+            query += f" AND type NOT IN ({', '.join('?' * len(names))})"
+            params += tuple(names)
+        self.chunks.stream(file_path, query, params)
+        self.clear_changes()
+        self.world_saved = True
+        self.current_save_fp = file_path
+        self.remove_scratch()
+        print(f"Game loaded in {perf_counter() - start:.3f}s, the rest of the save file is streamed in the background")
+
+    def quick_save(self, file_path: str = snapshot.QUICKSAVE_FILE) -> None:
+        """
+        Writes the whole world to a binary snapshot file, which is much faster than save_game() for large worlds.
+
+        Args:
+            file_path (str): The path of the snapshot file.
+        """
+        if not snapshot.available():
+            print("Quick saving needs NumPy.")
+            return
+        snapshot.save_snapshot(self, file_path)
+
+    def quick_load(self, file_path: str = snapshot.QUICKSAVE_FILE) -> None:
+        """
+        Replaces the world with the contents of a binary snapshot file.
+
+        Args:
+            file_path (str): The path of the snapshot file.
+        """
+        if not snapshot.available():
+            print("Quick loading needs NumPy.")
+            return
+        if not os.path.isfile(file_path):
+            print("File does not exist.")
+            return
+        snapshot.load_snapshot(self, file_path)
+
+    def close_db(self):
+        """
+        Waits for pending autosaves and closes the database connection.
+        """
+        self.autosave.flush()
+        self.chunks.stop_stream()
+        self.chunks.close()
+        if self.db_con is not None:
+            self.db_con.close()
+            self.db_con = None
+            self.db_cur = None
+            self.db_path = None
+        if self.scratch_fp is not None and self.scratch_fp == self.current_save_fp:
+            # the scratch file is not a save file the player chose, so it does not outlive the game
+            self.world_saved = False
+            self.current_save_fp = None
+            self.remove_scratch()
 
     def quit_game(self):
         """
         Quits the game.
         """
-        self.db_con.close() # close the database connection
+        self.close_db() # close the database connection
         pg.quit() # quit pygame
         quit() # quit python
 
@@ -259,4 +1109,11 @@ class World:
                             self.ui_inventory_bar,
                             self.ui_menu,
                             self.ui_load_game_selection,
-                            self.ui_save_game_selection]
\ No newline at end of file
+                            self.ui_save_game_selection]
+
+        # The world handles the input that no UI element consumed; elements later in the list are drawn on top and see input first
+        self.events.subscribe(pg.MOUSEBUTTONDOWN, self.handle_event, 0)
+        self.events.subscribe(pg.KEYDOWN, self.handle_event, 0)
+        self.events.subscribe(pg.MOUSEWHEEL, self.handle_event, 0)
+        for z, element in enumerate(self.ui_elements, start=1):
+            element.subscribe(self.events, z)
@@ -0,0 +1,133 @@
+try:
+    import numpy as np
+except ImportError: # procedural worlds need NumPy, like the node store
+    np = None
+from entities import Iron_Ore, Copper_Ore, Coal, Tree
+from ground import CHUNK_SIZE
+
+# The ores that form patches, with the salt of their noise field and the quantity range of their nodes
+ORES = ((Iron_Ore, 1, 200, 800),
+        (Copper_Ore, 2, 200, 800),
+        (Coal, 3, 150, 600))
+
+class World_Generator():
+    """
+    Fills chunks of the world with ore patches and forests from a seed.
+    Every chunk is generated on its own, from noise fields that are continuous across chunk borders,
+    so the world looks the same no matter in which order the chunks are generated. All tiles of a chunk are computed at once with NumPy.
+
+    Attributes:
+        seed (int): The seed of the world.
+        ore_scale (float): The size of the ore noise features in tiles. Larger values make larger, rarer patches.
+        ore_threshold (float): The noise value above which a tile is part of an ore patch.
+        forest_scale (float): The size of the forest noise features in tiles.
+        forest_threshold (float): The noise value above which a tile is part of a forest.
+        tree_density (float): The chance that a tree grows on a free spot in a forest.
+
+    Methods:
+        available(): Whether NumPy is installed.
+        noise(xs, ys, scale, salt): Returns smooth noise for tile positions.
+        generate_chunk(chunkX, chunkY): Returns the nodes of a chunk.
+    """
+
+    def __init__(self, seed: int, ore_scale: float = 24, ore_threshold: float = 0.76, forest_scale: float = 48, forest_threshold: float = 0.52, tree_density: float = 0.6) -> None:
+        self.seed = seed
+        self.ore_scale = ore_scale
+        self.ore_threshold = ore_threshold
+        self.forest_scale = forest_scale
+        self.forest_threshold = forest_threshold
+        self.tree_density = tree_density
+
+    @staticmethod
+    def available() -> bool:
+        """
+        Returns whether NumPy is installed and worlds can be generated.
+        """
+        return np is not None
+
+    def hash(self, xs, ys, salt: int):
+        """
+        Returns a pseudo-random number from 0 to 1 for each integer position, the same for the same seed, salt and position.
+
+        Args:
+            xs, ys (ndarray): The integer positions.
+            salt (int): Distinguishes independent random fields.
+
+        Returns:
+            ndarray: The random numbers as floats.
+        """
+        # unsigned arithmetic wraps around, which is what the mixing relies on
+        h = xs.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        h ^= ys.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+        h ^= np.uint64((self.seed * 0x165667B19E3779F9 + salt * 0x27D4EB2F165667C5) & 0xFFFFFFFFFFFFFFFF)
+        h ^= h >> np.uint64(31)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(29)
+        return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+    def value_noise(self, xs, ys, scale: float, salt: int):
+        """
+        Returns value noise: random values on a grid with `scale` tiles between points, smoothly interpolated in between.
+        """
+        fx = xs / scale
+        fy = ys / scale
+        x0 = np.floor(fx)
+        y0 = np.floor(fy)
+        tx = fx - x0
+        ty = fy - y0
+        # smoothstep hides the grid
+        tx = tx * tx * (3 - 2 * tx)
+        ty = ty * ty * (3 - 2 * ty)
+        x0 = x0.astype(np.int64)
+        y0 = y0.astype(np.int64)
+        top = self.hash(x0, y0, salt) * (1 - tx) + self.hash(x0 + 1, y0, salt) * tx
+        bottom = self.hash(x0, y0 + 1, salt) * (1 - tx) + self.hash(x0 + 1, y0 + 1, salt) * tx
+        return top * (1 - ty) + bottom * ty
+
+    def noise(self, xs, ys, scale: float, salt: int):
+        """
+        Returns smooth noise from 0 to 1 for tile positions, with a finer second octave for ragged edges.
+
+        Args:
+            xs, ys (ndarray): The tile positions.
+            scale (float): The size of the features in tiles.
+            salt (int): Distinguishes independent noise fields.
+
+        Returns:
+            ndarray: The noise values.
+        """
+        return 0.7 * self.value_noise(xs, ys, scale, salt) + 0.3 * self.value_noise(xs, ys, scale / 3, salt + 1000)
+
+    def generate_chunk(self, chunkX: int, chunkY: int) -> list:
+        """
+        Generates the ore nodes and trees of a chunk. Ore patches cover whole areas of tiles, with the richest nodes in their middle.
+        Where patches of different ores meet, the ore with the stronger noise wins. Trees grow on a 4 tile grid in forests, outside of ore patches.
+
+        Args:
+            chunkX, chunkY (int): The position of the chunk in chunks.
+
+        Returns:
+            list: The nodes of each entity type as (class, xs, ys, quantities) tuples of arrays.
+        """
+        xs, ys = np.meshgrid(np.arange(CHUNK_SIZE) + chunkX * CHUNK_SIZE, np.arange(CHUNK_SIZE) + chunkY * CHUNK_SIZE)
+        xs = xs.ravel()
+        ys = ys.ravel()
+        strengths = np.stack([self.noise(xs, ys, self.ore_scale, salt) for cls, salt, low, high in ORES])
+        ore = np.argmax(strengths, axis=0)
+        strength = strengths.max(axis=0)
+        in_patch = strength > self.ore_threshold
+        richness = (strength - self.ore_threshold) / (1 - self.ore_threshold)
+        nodes = []
+        for index, (cls, salt, low, high) in enumerate(ORES):
+            mask = in_patch & (ore == index)
+            if mask.any():
+                quantities = (low + (high - low) * richness[mask]).astype(np.int32)
+                nodes.append((cls, xs[mask], ys[mask], quantities))
+        # trees are 4 by 4 tiles, so one per grid cell never overlaps
+        width, height = Tree.size
+        spots = (xs % width == 0) & (ys % height == 0) & ~in_patch
+        spots &= self.noise(xs, ys, self.forest_scale, 10) > self.forest_threshold
+        spots &= self.hash(xs, ys, 11) < self.tree_density
+        if spots.any():
+            nodes.append((Tree, xs[spots], ys[spots], np.full(int(spots.sum()), Tree.quantity, np.int32)))
+        return nodes